@@ -0,0 +1,57 @@
+"""Compare per-cell clean_text with the vectorized and factorized cleaners.
+
+Usage: python benchmarks/bench_clean_text.py [rows]
+
+Builds a verbatim-heavy frame by resampling the text columns of task2.csv to
+``rows`` rows, checks the implementations agree and prints their timings.
+``clean_text_column`` only cleans distinct values, so its gain grows with
+how often values repeat; resampling 100 rows makes every column repetitive.
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from repairs_pipeline.cleaning import (  # noqa: E402
+    RAW_FILE_NAME,
+    TEXT_COLS_TO_CLEAN,
+    clean_text,
+    clean_text_column,
+    clean_text_series,
+    load_raw,
+    standardize_columns,
+)
+
+
+def best_of(func, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(rows=200_000):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    df = standardize_columns(load_raw(os.path.join(root, RAW_FILE_NAME)), verbose=False)
+    rng = np.random.default_rng(0)
+    sample = df.iloc[rng.integers(0, len(df), rows)].reset_index(drop=True)
+
+    print(f"{'column':<32}{'apply (s)':>12}{'vectorized (s)':>16}{'factorized (s)':>16}{'speedup':>10}")
+    for col in TEXT_COLS_TO_CLEAN:
+        series = sample[col]
+        expected = series.apply(clean_text)
+        assert expected.equals(clean_text_series(series)), col
+        assert expected.equals(clean_text_column(series, max_unique_ratio=1.0)), col
+        t_apply = best_of(lambda: series.apply(clean_text))
+        t_vector = best_of(lambda: clean_text_series(series))
+        t_factor = best_of(lambda: clean_text_column(series, max_unique_ratio=1.0))
+        print(f"{col:<32}{t_apply:>12.3f}{t_vector:>16.3f}{t_factor:>16.3f}{t_apply / t_factor:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
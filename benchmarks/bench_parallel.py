@@ -0,0 +1,55 @@
+"""Time the row-local cleaning stages across process-pool sizes.
+
+Usage: python benchmarks/bench_parallel.py [--rows N] [--workers 2 4 8]
+
+Resamples task2.csv to ``rows`` rows, runs clean/type/filter serially and
+through ``clean_rows_parallel`` with each worker count, checks every result
+matches the serial one and prints wall time and speedup. Scaling needs as
+many physical cores as the largest worker count.
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from repairs_pipeline.cleaning import RAW_FILE_NAME, CleaningPipeline, load_raw, standardize_columns  # noqa: E402
+from repairs_pipeline.parallel import clean_rows_parallel  # noqa: E402
+
+
+def timed(func):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = func()
+    return result, time.perf_counter() - start
+
+
+def main(rows=1_000_000, worker_counts=(2, 4, 8)):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = standardize_columns(load_raw(os.path.join(root, RAW_FILE_NAME)), verbose=False)
+    rng = np.random.default_rng(0)
+    sample = df.iloc[rng.integers(0, len(df), rows)].reset_index(drop=True)
+    pipeline = CleaningPipeline(use_cache=False)
+
+    print(f"{rows} rows on {os.cpu_count()} CPU(s)")
+    print(f"{'workers':>8}{'wall (s)':>12}{'speedup':>10}")
+    baseline, t_serial = timed(lambda: clean_rows_parallel(sample.copy(), pipeline, workers=1))
+    print(f"{'serial':>8}{t_serial:>12.3f}{1:>9.1f}x")
+    for workers in worker_counts:
+        result, elapsed = timed(lambda: clean_rows_parallel(sample.copy(), pipeline, workers=workers))
+        assert result.equals(baseline), workers
+        print(f"{workers:>8}{elapsed:>12.3f}{t_serial / elapsed:>9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[2, 4, 8])
+    args = parser.parse_args()
+    main(args.rows, args.workers)
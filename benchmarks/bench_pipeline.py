@@ -0,0 +1,175 @@
+"""Time every pipeline stage on synthetic extracts of increasing size.
+
+Usage: python benchmarks/bench_pipeline.py [--sizes 10k 1M 10M] [--output FILE]
+
+For each size a synthetic task2.csv is written once to ``--data-dir`` (see
+``synthetic.py``) and reused by later runs. The cleaning stages, the CSV
+save, ``analyze_repairs`` and ``generate_nlp_tags`` are then run one after
+another, each recording wall time, peak RSS and rows/sec. Every stage is
+appended to ``--output`` as one JSON line, tagged with the run timestamp and
+git revision, so results from successive commits can be compared.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import matplotlib
+
+matplotlib.use('Agg')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic import write_task2  # noqa: E402
+
+from repairs_pipeline.cleaning import (  # noqa: E402
+    CleaningPipeline,
+    cap_outliers,
+    clean_text_columns,
+    consolidate_categories,
+    correct_types,
+    drop_sparse_rows,
+    impute_missing,
+    load_raw,
+    standardize_columns,
+)
+from repairs_pipeline.tagging import generate_nlp_tags  # noqa: E402
+from repairs_pipeline.visualization import analyze_repairs  # noqa: E402
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BENCH_DIR, 'data')
+RESULTS_FILE = os.path.join(BENCH_DIR, 'results.jsonl')
+SIZES = ['10k', '1M', '10M']
+
+
+def parse_size(size):
+    """'10k' -> 10000, '1M' -> 1000000; plain integers are accepted too."""
+    multipliers = {'k': 1_000, 'm': 1_000_000}
+    suffix = size[-1].lower()
+    if suffix in multipliers:
+        return int(float(size[:-1]) * multipliers[suffix])
+    return int(size)
+
+
+def _reset_peak_rss():
+    """Reset the kernel's resident-set high-water mark so each stage gets its own peak (Linux only)."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+def _peak_rss_mb():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is the peak of the whole process, in KiB on Linux and bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCH_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def measure(stage, rows, func):
+    """Run ``func`` quietly and return ``(result, record)`` for ``stage``.
+
+    ``rows=None`` counts the rows of the frame ``func`` returns, for the load.
+    """
+    _reset_peak_rss()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = func()
+    elapsed = time.perf_counter() - start
+    rows = len(result) if rows is None else rows
+    record = {
+        'stage': stage,
+        'rows': rows,
+        'seconds': round(elapsed, 4),
+        'peak_rss_mb': round(_peak_rss_mb(), 1),
+        'rows_per_sec': round(rows / elapsed) if elapsed > 0 else None,
+    }
+    return result, record
+
+
+def bench_size(raw_file, work_dir):
+    pipeline = CleaningPipeline(raw_file, use_cache=False)
+    records = []
+
+    def step(stage, rows, func):
+        result, record = measure(stage, rows, func)
+        records.append(record)
+        print(f"{stage:<12}{record['rows']:>12}{record['seconds']:>10.2f}"
+              f"{record['peak_rss_mb']:>12.0f}{record['rows_per_sec'] or 0:>14}")
+        return result
+
+    df = step('load', None, lambda: load_raw(raw_file))
+    rows = len(df)
+    df = step('standardize', rows, lambda: standardize_columns(df))
+    df = step('clean', rows, lambda: clean_text_columns(df, pipeline.text_cols))
+    df = step('type', rows, lambda: correct_types(df, pipeline.numeric_cols))
+    df = step('filter', rows, lambda: drop_sparse_rows(df, pipeline.max_missing))
+    rows = len(df)
+    df = step('impute', rows, lambda: impute_missing(df, pipeline.numeric_cols))
+    df = step('cap', rows, lambda: cap_outliers(df, pipeline.outlier_check_cols))
+    df = step('consolidate', rows, lambda: consolidate_categories(df, pipeline.consolidation_map))
+    step('save', rows, lambda: df.to_csv(os.path.join(work_dir, 'cleaned.csv'), index=False, encoding='utf-8'))
+
+    cwd = os.getcwd()
+    os.chdir(work_dir)
+    try:
+        step('charts', rows, lambda: analyze_repairs(df))
+    finally:
+        os.chdir(cwd)
+    step('tags', rows, lambda: generate_nlp_tags(df))
+    return records
+
+
+def main(sizes=SIZES, output=RESULTS_FILE, data_dir=DATA_DIR, seed=0):
+    run = {
+        'run': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'revision': git_revision(),
+    }
+    os.makedirs(data_dir, exist_ok=True)
+    for size in sizes:
+        n = parse_size(size)
+        raw_file = os.path.join(data_dir, f'task2_{size}_seed{seed}.csv')
+        if not os.path.exists(raw_file):
+            print(f"Writing {n} synthetic rows to '{raw_file}'...")
+            write_task2(raw_file, n, seed)
+
+        print(f"\n{size} rows")
+        print(f"{'stage':<12}{'rows':>12}{'wall (s)':>10}{'peak MB':>12}{'rows/sec':>14}")
+        with tempfile.TemporaryDirectory() as work_dir:
+            records = bench_size(raw_file, work_dir)
+        with open(output, 'a', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps({**run, 'size': size, **record}) + '\n')
+    print(f"\nResults appended to '{output}'")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', nargs='+', default=SIZES)
+    parser.add_argument('--output', default=RESULTS_FILE)
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    main(args.sizes, args.output, args.data_dir, args.seed)
@@ -0,0 +1,78 @@
+"""Time cold starts of the pipeline's command-line entry points.
+
+Usage: python benchmarks/bench_startup.py [--repeat 5] [--input task2.csv]
+
+Each command runs ``--repeat`` times in a fresh interpreter and the best and
+median wall times are reported. One more run under ``python -X importtime``
+lists which of the heavy libraries the command imported. The clean-only path
+(``python -m repairs_pipeline clean`` on the 100-row extract) should not
+import scikit-learn or matplotlib and should finish in under a second.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ['pandas', 'pyarrow', 'sklearn', 'scipy', 'matplotlib']
+CLEAN_TARGET_SECONDS = 1.0
+
+
+def commands(input_file, out_dir):
+    cli = [sys.executable, '-m', 'repairs_pipeline']
+    return {
+        'import repairs_pipeline': [sys.executable, '-c', 'import repairs_pipeline'],
+        'cli --help': cli + ['--help'],
+        'clean': cli + ['clean', '--input', input_file, '--out', out_dir, '--no-cache', '--force'],
+    }
+
+
+def _env():
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [REPO_DIR, env.get('PYTHONPATH')]))
+    return env
+
+
+def time_command(command, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=REPO_DIR, env=_env(), check=True, stdout=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    return min(timings), statistics.median(timings)
+
+
+def imported_heavy_modules(command):
+    """The ``HEAVY_MODULES`` a command imports, read from ``-X importtime``."""
+    traced = [command[0], '-X', 'importtime'] + command[1:]
+    stderr = subprocess.run(traced, cwd=REPO_DIR, env=_env(), check=True, stdout=subprocess.DEVNULL,
+                            stderr=subprocess.PIPE, text=True).stderr
+    imported = {line.rsplit('|', 1)[-1].strip().split('.')[0]
+                for line in stderr.splitlines() if line.startswith('import time:')}
+    return [name for name in HEAVY_MODULES if name in imported]
+
+
+def main(repeat=5, input_file=None):
+    input_file = os.path.abspath(input_file or os.path.join(REPO_DIR, 'task2.csv'))
+    print(f"{'command':<26}{'best (s)':>10}{'median (s)':>12}  heavy imports")
+    with tempfile.TemporaryDirectory() as out_dir:
+        results = {}
+        for name, command in commands(input_file, out_dir).items():
+            best, median = time_command(command, repeat)
+            heavy = imported_heavy_modules(command)
+            results[name] = median
+            print(f"{name:<26}{best:>10.2f}{median:>12.2f}  {', '.join(heavy) or '-'}")
+
+    verdict = 'under' if results['clean'] < CLEAN_TARGET_SECONDS else 'OVER'
+    print(f"\nClean-only path: {results['clean']:.2f}s median, {verdict} the {CLEAN_TARGET_SECONDS:.0f}s target.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--input', default=None, help="raw extract for the clean run (default: task2.csv)")
+    args = parser.parse_args()
+    main(args.repeat, args.input)
@@ -0,0 +1,111 @@
+"""Synthesize task2.csv-shaped repair extracts of any size.
+
+Usage: python benchmarks/synthetic.py ROWS OUTPUT_CSV [--seed N]
+
+The 52 columns follow the real extract: codes, dealers and descriptions are
+resampled from task2.csv (keeping its missing-value rates), VINs are random
+17-character VINs, verbatims carry the same noise the cleaner removes
+(backslashes, embedded newlines and tabs, double spaces), KM and costs are
+lognormal and written with ',' thousands separators, and a few percent of
+rows are sparse enough for the missing-value filter to drop. Rows are
+generated and appended in blocks, so memory stays flat however many rows are
+written.
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from repairs_pipeline.cleaning import RAW_FILE_NAME  # noqa: E402
+from repairs_pipeline.schema import ENCODING, read_header  # noqa: E402
+
+BLOCK_ROWS = 250_000
+SPARSE_ROW_RATE = 0.04
+NOISY_VERBATIM_RATE = 0.1
+
+VIN_ALPHABET = np.array(list('ABCDEFGHJKLMNPRSTUVWXYZ0123456789'))
+DATE_RANGE = ('2023-01-01', '2024-12-31')
+SPARSE_COLUMNS = ['PLANT', 'STATE', 'VEH_TEST_GRP', 'OPTN_FAMLY_CERTIFICATION', 'ENGINE_SOURCE_PLANT',
+                  'ENGINE_TRACE_NBR', 'TRANSMISSION_TRACE_NBR', 'LINE_SERIES']
+VERBATIM_NOISE = ['\\', '\n', '\t', '  ']
+
+
+def load_seed(file_name=None):
+    """The real extract as text, the pool every resampled column draws from."""
+    file_name = file_name or os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                          RAW_FILE_NAME)
+    return pd.read_csv(file_name, encoding=ENCODING, header=0, names=read_header(file_name), dtype=str)
+
+
+def _thousands(values, decimals):
+    """Format ``values`` the way the extract does: "8,872" and "2,457.45"."""
+    return pd.Series(values).map(f'{{:,.{decimals}f}}'.format).to_numpy()
+
+
+def _vins(rng, rows):
+    return VIN_ALPHABET[rng.integers(0, len(VIN_ALPHABET), (rows, 17))].view('<U17').ravel()
+
+
+def _noisy(rng, verbatims):
+    noisy = rng.random(len(verbatims)) < NOISY_VERBATIM_RATE
+    positions = np.flatnonzero(noisy & pd.notna(verbatims))
+    noise = np.array(VERBATIM_NOISE, dtype=object)[rng.integers(0, len(VERBATIM_NOISE), len(positions))]
+    for position, token in zip(positions, noise):
+        text = verbatims[position]
+        cut = rng.integers(0, len(text) + 1)
+        verbatims[position] = text[:cut] + token + text[cut:]
+    return verbatims
+
+
+def generate_block(seed_df, rows, rng, first_txn_id=3_000_000_000):
+    """One block of ``rows`` synthetic records with the columns of ``seed_df``."""
+    picks = rng.integers(0, len(seed_df), (rows, len(seed_df.columns)))
+    block = pd.DataFrame({col: seed_df[col].to_numpy()[picks[:, i]] for i, col in enumerate(seed_df.columns)})
+
+    block['VIN'] = _vins(rng, rows)
+    block['SRC_TXN_ID'] = np.arange(first_txn_id, first_txn_id + rows)
+    start, end = pd.Timestamp(DATE_RANGE[0]), pd.Timestamp(DATE_RANGE[1])
+    days = rng.integers(0, (end - start).days + 1, rows)
+    block['REPAIR_DATE'] = (start + pd.to_timedelta(days, unit='D')).strftime('%m-%d-%Y')
+
+    block['REPAIR_AGE'] = rng.integers(0, 36, rows)
+    block['KM'] = _thousands(np.round(rng.lognormal(9.5, 1.3, rows)), 0)
+    reporting_cost = np.round(rng.lognormal(6.0, 0.8, rows), 2)
+    block['REPORTING_COST'] = _thousands(reporting_cost, 2)
+    block['TOTALCOST'] = block['REPORTING_COST'].where(rng.random(rows) > 0.06)
+    block['LBRCOST'] = _thousands(np.round(reporting_cost * rng.uniform(0.05, 0.4, rows), 2), 2)
+
+    for col in ('CORRECTION_VERBATIM', 'CUSTOMER_VERBATIM'):
+        block[col] = _noisy(rng, block[col].to_numpy())
+
+    sparse = rng.random(rows) < SPARSE_ROW_RATE
+    block.loc[sparse, SPARSE_COLUMNS] = np.nan
+    return block
+
+
+def write_task2(file_name, rows, seed=0, seed_df=None, block_rows=BLOCK_ROWS):
+    """Write ``rows`` synthetic records to ``file_name`` in the raw extract's layout."""
+    seed_df = load_seed() if seed_df is None else seed_df
+    rng = np.random.default_rng(seed)
+    written = 0
+    with open(file_name, 'w', encoding='utf-8-sig', newline='') as f:
+        while written < rows:
+            n = min(block_rows, rows - written)
+            block = generate_block(seed_df, n, rng, first_txn_id=3_000_000_000 + written)
+            block.to_csv(f, header=written == 0, index=False)
+            written += n
+    return file_name
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('rows', type=int)
+    parser.add_argument('output')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    write_task2(args.output, args.rows, args.seed)
+    print(f"Wrote {args.rows} synthetic rows to '{args.output}'")
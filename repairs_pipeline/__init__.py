@@ -0,0 +1,32 @@
+"""Cleaning, charting and NLP tagging for the vehicle repairs extract.
+
+The public names are imported on first use, so each entry point only loads
+the libraries its stage needs: cleaning pandas, tagging scikit-learn and the
+charts matplotlib.
+"""
+import importlib
+
+_EXPORTS = {
+    'CleaningPipeline': 'cleaning',
+    'analyze_repairs': 'visualization',
+    'clean_text': 'cleaning',
+    'generate_nlp_tags': 'tagging',
+    'refit_nlp_tags': 'tagging',
+    'save_nlp_tags': 'tagging',
+    'update_nlp_tags': 'tagging',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
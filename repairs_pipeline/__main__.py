@@ -0,0 +1,220 @@
+"""Run the repairs pipeline headlessly: cleaning, charts and NLP tags.
+
+Usage: python -m repairs_pipeline {clean,charts,tags,all} [--input task2.csv] [--out DIR] [--workers N]
+
+Every output goes to ``--out``: the cleaned CSV and Parquet, the chart PNGs,
+the tags CSV, the versioned tag model and the stage cache. Runs are
+resumable: the stages completed for an input are recorded in
+``pipeline_run.json`` under ``--out``, and a later run against the same input
+skips them unless their outputs are gone or an option that changes their
+output (``STAGE_OPTIONS``) differs (``--force`` re-runs). Within the
+cleaning, the stage cache resumes after the last unchanged stage.
+Re-running the cleaning marks the charts and tags as not done.
+
+Exit codes: 0 when every selected stage succeeded or was already done, 1 when
+a stage failed (later stages are not run), 2 for invalid arguments or a
+missing input file.
+
+Only the libraries a stage needs are imported, and only once it runs: the
+cleaning loads pandas, the charts matplotlib (with the headless Agg
+backend) and the tags scikit-learn. ``--help`` and argument errors load
+none of them.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import traceback
+from datetime import datetime, timezone
+
+from .stage_cache import CACHE_DIR
+
+STAGES = ('clean', 'charts', 'tags')
+DEPENDENT_STAGES = {'clean': ('charts', 'tags')}
+# Options that change a stage's output; a stage completed with other values is run again.
+STAGE_OPTIONS = {'clean': ('statistics', 'stream', 'chunksize'), 'tags': ('statistics',)}
+RUN_STATE_FILE = 'pipeline_run.json'
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+
+
+def load_run_state(out_dir, input_digest):
+    """Completed stages recorded under ``out_dir``, or a fresh state when the input changed."""
+    path = os.path.join(out_dir, RUN_STATE_FILE)
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get('input_digest') == input_digest:
+            state.setdefault('options', {})
+            return state
+    return {'input_digest': input_digest, 'completed': {}, 'options': {}}
+
+
+def stage_options_digest(stage, options):
+    """Digest of the ``options`` values that ``STAGE_OPTIONS`` lists for ``stage``."""
+    relevant = {name: options[name] for name in STAGE_OPTIONS.get(stage, ())}
+    return hashlib.sha256(json.dumps(relevant, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def save_run_state(out_dir, state):
+    path = os.path.join(out_dir, RUN_STATE_FILE)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+
+
+class PipelineRun:
+    """The selected stages of one command-line run, sharing the cleaned frame in memory."""
+
+    def __init__(self, args, input_digest=None):
+        from .cleaning import CLEANED_FILE_NAME, CLEANED_PARQUET_FILE_NAME
+
+        self.args = args
+        self.input_digest = input_digest
+        self.out = args.out
+        self.cleaned_file = os.path.join(self.out, CLEANED_FILE_NAME)
+        self.parquet_file = os.path.join(self.out, CLEANED_PARQUET_FILE_NAME)
+        self.df_cleaned = None
+
+    def outputs_present(self, stage):
+        from .tagging import TAGS_FILE_NAME
+        from .visualization import CHART_FILE_NAMES
+
+        outputs = {
+            'clean': [self.cleaned_file],
+            'charts': [os.path.join(self.out, name) for name in CHART_FILE_NAMES],
+            'tags': [os.path.join(self.out, TAGS_FILE_NAME)],
+        }
+        return all(os.path.exists(path) for path in outputs.get(stage, []))
+
+    def cleaned(self, columns):
+        """The cleaned frame from this run, or the columns needed from the saved file."""
+        from .cleaning import load_cleaned
+
+        if self.df_cleaned is not None:
+            return self.df_cleaned
+        source = self.parquet_file if os.path.exists(self.parquet_file) else self.cleaned_file
+        df = load_cleaned(source, columns)
+        if df is None:
+            raise RuntimeError(f"No cleaned data at '{source}'; run the 'clean' stage first.")
+        return df
+
+    def clean(self):
+        from .cleaning import CleaningPipeline
+
+        args = self.args
+        pipeline = CleaningPipeline(args.input, cache_dir=os.path.join(self.out, CACHE_DIR),
+                                    use_cache=not args.no_cache, workers=args.workers,
+                                    stage_log=args.stage_log, statistics=args.statistics,
+                                    input_digest=self.input_digest)
+        if args.stream:
+            pipeline.stream(self.cleaned_file, args.chunksize)
+            if os.path.exists(self.parquet_file):
+                os.remove(self.parquet_file)  # stale: the charts and tags would read it first
+        else:
+            pipeline.save(self.cleaned_file, self.parquet_file)
+            self.df_cleaned = pipeline.df_cleaned
+
+    def charts(self):
+        import matplotlib
+
+        matplotlib.use('Agg')
+        from .visualization import CHART_COLUMNS, analyze_repairs
+
+        analyze_repairs(self.cleaned(CHART_COLUMNS), self.out)
+
+    def tags(self):
+        from .cleaning import load_statistics
+        from .tagging import (
+            MODEL_DIR,
+            TAG_KEY,
+            TAGS_FILE_NAME,
+            frozen_model_version,
+            refit_nlp_tags,
+            update_nlp_tags,
+        )
+
+        df = self.cleaned([TAG_KEY, 'customer_verbatim', 'correction_verbatim'])
+        tags_file = os.path.join(self.out, TAGS_FILE_NAME)
+        model_dir = os.path.join(self.out, MODEL_DIR)
+        if self.args.refit:
+            refit_nlp_tags(df, tags_file, model_dir)
+        else:
+            version = None
+            if self.args.statistics:
+                version = frozen_model_version(load_statistics(self.args.statistics))
+            update_nlp_tags(df, tags_file, model_dir, version=version)
+
+
+def run(args):
+    from .cleaning import file_digest
+
+    for name in ('input', 'statistics'):
+        path = getattr(args, name)
+        if path is not None and not os.path.isfile(path):
+            print(f"Error: {name} file '{path}' not found.", file=sys.stderr)
+            return EXIT_USAGE
+    os.makedirs(args.out, exist_ok=True)
+
+    options = {
+        'statistics': file_digest(args.statistics) if args.statistics else None,
+        'stream': args.stream,
+        'chunksize': args.chunksize if args.stream else None,
+    }
+    stages = STAGES if args.stage == 'all' else (args.stage,)
+    input_digest = file_digest(args.input)
+    state = load_run_state(args.out, input_digest)
+    pipeline_run = PipelineRun(args, input_digest)
+    for stage in stages:
+        options_digest = stage_options_digest(stage, options)
+        rerun = args.force or stage == 'tags' and args.refit
+        if (stage in state['completed'] and state['options'].get(stage) == options_digest
+                and pipeline_run.outputs_present(stage) and not rerun):
+            print(f"Skipping '{stage}': already completed for this input and options at {state['completed'][stage]}.")
+            continue
+
+        print(f"\n=== {stage} ===")
+        try:
+            getattr(pipeline_run, stage)()
+        except Exception:
+            traceback.print_exc()
+            print(f"Error: stage '{stage}' failed.", file=sys.stderr)
+            return EXIT_FAILED
+
+        for dependent in DEPENDENT_STAGES.get(stage, ()):
+            state['completed'].pop(dependent, None)
+        state['completed'][stage] = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        state['options'][stage] = options_digest
+        save_run_state(args.out, state)
+    return EXIT_OK
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m repairs_pipeline', description=__doc__.splitlines()[0])
+    parser.add_argument('stage', choices=STAGES + ('all',), help="stage to run; 'all' runs them in order")
+    parser.add_argument('--input', default='task2.csv', help="raw repairs extract")
+    parser.add_argument('--out', default='.', help="directory for every output")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="processes for the row-local cleaning stages; 0 uses every CPU")
+    parser.add_argument('--stream', action='store_true', help="clean in bounded memory, chunk by chunk")
+    parser.add_argument('--chunksize', type=int, default=None, help="rows per chunk with --stream")
+    parser.add_argument('--statistics', default=None,
+                        help="clean, and tag, against frozen cleaning statistics and vocabulary")
+    parser.add_argument('--refit', action='store_true', help="re-baseline the tag vocabulary and rewrite every tag")
+    parser.add_argument('--stage-log', default=None, help="append per-stage JSON lines to this file")
+    parser.add_argument('--no-cache', action='store_true', help="do not read or write the stage cache")
+    parser.add_argument('--force', action='store_true', help="re-run stages already completed")
+    args = parser.parse_args(argv)
+    if args.workers < 0:
+        parser.error("--workers must be 0 or more")
+    if args.refit and args.statistics:
+        parser.error("--refit cannot be combined with --statistics, which pins the frozen vocabulary")
+    if args.stream and args.stage_log:
+        parser.error("--stage-log records whole-frame stages and cannot be combined with --stream")
+    return run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
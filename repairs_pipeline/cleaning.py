@@ -0,0 +1,931 @@
+import hashlib
+import importlib.util
+import json
+import os
+import re
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from .compaction import compact_frame
+from .consolidation import ConsolidationRules, from_codes, load_rules
+from .instrumentation import StageRecorder
+from .parsing import parse_dates, parse_numeric
+from .schema import ENCODING, read_header, read_typed_csv
+from .sketches import QuantileSketch
+from .stage_cache import CACHE_DIR, CACHE_MAX_BYTES, StageCache, stage_key
+
+# Part of every stage cache key; bump it when a stage's output changes.
+PIPELINE_VERSION = 4
+
+RAW_FILE_NAME = 'task2.csv'
+CLEANED_FILE_NAME = 'cleaned_vehicle_repairs_Cleaned.csv'
+CLEANED_PARQUET_FILE_NAME = 'cleaned_vehicle_repairs_Cleaned.parquet'
+STATISTICS_FILE_NAME = 'cleaning_statistics.json'
+
+TEXT_COLS_TO_CLEAN = [
+    'correction_verbatim',
+    'customer_verbatim',
+    'engine_desc',
+    'transmission_desc',
+    'causal_part_nm',
+    'global_labor_code_description'
+]
+
+NUMERIC_COLS = ['repair_age', 'km', 'reporting_cost', 'totalcost', 'lbrcost']
+
+OUTLIER_CHECK_COLS = ['km', 'totalcost', 'lbrcost']
+
+OUTLIER_QUANTILES = [0.25, 0.75, 0.01, 0.99]
+
+# Grouped imputation: numeric gaps take the median of the first level whose
+# group has values, then the global median.
+IMPUTE_GROUP_LEVELS = [['platform', 'vppc'], ['platform']]
+
+# Grouped outlier capping: groups with fewer rows than this use the global bounds.
+OUTLIER_GROUP_COLS = ['platform', 'global_labor_code']
+MIN_OUTLIER_GROUP_SIZE = 30
+
+MAX_MISSING_PER_ROW = 5
+
+# Stages whose output is cached: the parsed extract, the frame after the
+# row-local stages and the cleaned result, compacted or not. The stages in
+# between are cheap next to writing another copy of the frame; any stage
+# can be listed.
+CACHED_STAGES = ('load', 'filter', 'consolidate', 'compact')
+
+# Text columns with at most this share of distinct values are cleaned once per
+# distinct value; free-text columns above it are cleaned row by row.
+FACTORIZE_MAX_UNIQUE_RATIO = 0.5
+
+PART_NAME_TYPO_FIXES = {
+    'wheel asm-strg *backen blackk': 'wheel asm-strg *black'
+}
+
+CONSOLIDATION_MAP = {
+    'wheel asm-strg *jet black': 'wheel asm-strg *black',
+    '"wheel,strg *jet black"': 'wheel asm-strg *black',
+    'wheel asm-strg *very dark at': 'wheel asm-strg *very dark atmosphere',
+    'wheel asm-strg *dark titaniu': 'wheel asm-strg *dark titanium'
+}
+
+
+def load_raw(file_name):
+    """Read the raw repairs extract with the declared schema.
+
+    When a cost or mileage value carries formatting the C parser rejects
+    (currency symbols, parenthesized negatives) the measures are re-read as
+    text for ``correct_types`` to parse. Anything else that does not fit the
+    schema falls back to an untyped read that skips bad lines.
+    """
+    try:
+        df = read_typed_csv(file_name)
+    except pd.errors.ParserError as e:
+        df = _read_untyped(file_name, e)
+    except ValueError as e:
+        print(f"Typed read failed: {e}. Re-reading numeric measures as text...")
+        try:
+            df = read_typed_csv(file_name, measures_as_text=True)
+        except ValueError as e:
+            df = _read_untyped(file_name, e)
+
+    print(f"Successfully loaded data from '{file_name}'. Shape: {df.shape}")
+    print("-" * 30)
+    return df
+
+
+def _read_untyped(file_name, error):
+    print(f"Typed read failed: {error}. Falling back to untyped read with on_bad_lines='skip'...")
+    return pd.read_csv(file_name, encoding=ENCODING, header=0, names=read_header(file_name),
+                       thousands=',', on_bad_lines='skip')
+
+
+def read_raw_chunks(file_name, chunksize, dtype=None):
+    """Iterate over the raw repairs extract ``chunksize`` rows at a time.
+
+    A chunked read cannot restart from the top when one value deep in the
+    file has unexpected formatting, so the numeric measures are always read
+    as text here and parsed by ``correct_types``.
+    """
+    return read_typed_csv(file_name, categoricals=False, chunksize=chunksize, dtype=dtype,
+                          measures_as_text=True)
+
+
+def standardize_columns(df, verbose=True):
+    df.columns = [col.lower().strip().replace(' ', '_') for col in df.columns]
+    if verbose:
+        print("Column names standardized to snake_case.")
+    return df
+
+
+def clean_text(text):
+    if not isinstance(text, str):
+        return text
+    text = re.sub(r'\\', '', text)
+    text = re.sub(r'[\n\t]+', ' ', text)
+    text = text.replace('  ', 'unknown_encoding_error')
+    text = text.lower().strip()
+    text = re.sub(r'\\', '', text)
+    return text
+
+
+_NEWLINE_TAB_RE = re.compile(r'[\n\t]+')
+
+
+def _text_mask(series):
+    """Boolean mask of the cells of ``series`` that are strings."""
+    if pd.api.types.infer_dtype(series, skipna=True) == 'string':
+        return series.notna()
+    return series.map(lambda value: isinstance(value, str)).astype(bool)
+
+
+def clean_text_series(series):
+    """Vectorized ``clean_text`` over a whole column.
+
+    Produces exactly what ``series.apply(clean_text)`` does, but each step
+    runs once over the column through the ``.str`` accessor instead of once
+    per cell. The trailing backslash removal in ``clean_text`` is a no-op
+    (nothing after the first removal can introduce one) and is skipped.
+    Non-string cells are passed through untouched.
+    """
+    is_text = _text_mask(series)
+    if not is_text.any():
+        return series
+
+    text = series[is_text].str.replace('\\', '', regex=False)
+
+    # The character-class regex is by far the slowest step, so it only runs
+    # on the rows that actually contain a newline or tab.
+    has_break = text.str.contains('\n', regex=False) | text.str.contains('\t', regex=False)
+    if has_break.any():
+        text[has_break] = text[has_break].str.replace(_NEWLINE_TAB_RE, ' ', regex=True)
+
+    cleaned = (
+        text.str.replace('  ', 'unknown_encoding_error', regex=False)
+        .str.lower()
+        .str.strip()
+    )
+    result = series.copy()
+    result[is_text] = cleaned
+    return result
+
+
+def clean_text_column(series, max_unique_ratio=FACTORIZE_MAX_UNIQUE_RATIO):
+    """``clean_text_series`` run on the distinct values of ``series`` when it repeats enough.
+
+    Descriptions such as ``engine_desc`` take a handful of values over
+    millions of rows, so the column is factorized, the unique values are
+    cleaned and the result is mapped back through the codes. Mostly-unique
+    columns (the verbatims) skip the mapping and are cleaned directly.
+    Categoricals have their categories cleaned, merging any that become
+    equal, and columns without strings are returned as they are.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return _clean_categories(series)
+    if not _text_mask(series).any():
+        return series
+    codes, uniques = pd.factorize(series)
+    if len(uniques) > max_unique_ratio * len(series):
+        return clean_text_series(series)
+    return from_codes(series, codes, clean_text_series(pd.Series(np.asarray(uniques, dtype=object))))
+
+
+def _clean_categories(series):
+    categories = clean_text_series(pd.Series(series.cat.categories, dtype=object))
+    if categories.is_unique:
+        return series.cat.rename_categories(categories.tolist())
+    category_codes, merged = pd.factorize(categories)
+    codes = series.cat.codes.to_numpy()
+    codes = np.where(codes >= 0, category_codes[codes], -1)
+    values = pd.Categorical.from_codes(codes, merged, ordered=series.cat.ordered)
+    return pd.Series(values, index=series.index, name=series.name)
+
+
+def clean_text_columns(df, text_cols=TEXT_COLS_TO_CLEAN, verbose=True):
+    for col in text_cols:
+        if col in df.columns:
+            df[col] = clean_text_column(df[col])
+
+    if verbose:
+        print("Text cleaning complete.")
+    return df
+
+
+def correct_types(df, numeric_cols=NUMERIC_COLS, verbose=True, coerced=None, date_format=None, dates=None):
+    """Parse ``repair_date`` and ``numeric_cols``; unparseable values become NaN/NaT.
+
+    Per-column counts of numeric values that could not be parsed are added
+    into ``coerced`` when a dict is passed, so chunked callers can total them.
+    Dates are parsed with ``date_format``, detected from the column when not
+    given (see ``parsing.parse_dates``); its report is added into ``dates``.
+    """
+    if verbose:
+        print("Correcting data types...")
+
+    if 'repair_date' in df.columns:
+        df['repair_date'], date_report = parse_dates(df['repair_date'], date_format)
+        if dates is not None:
+            add_date_report(dates, date_report)
+        if verbose:
+            print_date_report(date_report)
+
+    for col in numeric_cols:
+        if col in df.columns:
+            df[col], col_coerced = parse_numeric(df[col])
+            if coerced is not None:
+                coerced[col] = coerced.get(col, 0) + col_coerced
+            if verbose and col_coerced:
+                print(f"'{col}': {col_coerced} value(s) could not be parsed as numbers and were set to NaN.")
+
+    if verbose:
+        print("Data types corrected. Any conversion errors are marked as NaN/NaT.")
+    return df
+
+
+def add_date_report(dates, report):
+    """Total a ``parsing.parse_dates`` report into ``dates``; the first detected format is kept."""
+    for name, value in report.items():
+        if name == 'format':
+            if dates.get(name) is None:
+                dates[name] = value
+        elif name == 'format_ambiguous':
+            dates[name] = dates.get(name, False) or value
+        else:
+            dates[name] = dates.get(name, 0) + value
+    return dates
+
+
+def print_date_report(dates, col='repair_date'):
+    if dates.get('format') is None:
+        print(f"'{col}': no known date format fits; every value was parsed individually.")
+    elif dates.get('format_ambiguous'):
+        print(f"'{col}': parsed as {dates['format']}, but the sampled dates fit another layout as well.")
+    else:
+        print(f"'{col}': parsed as {dates['format']}.")
+    if dates.get('fallback'):
+        print(f"'{col}': {dates['fallback']} value(s) did not match {dates.get('format')} and were parsed "
+              f"individually; {dates['ambiguous']} of them could also be read day-first.")
+    if dates.get('unparseable'):
+        print(f"'{col}': {dates['unparseable']} value(s) could not be parsed as dates and were set to NaT.")
+
+
+def count_missing_per_row(df, col_missing=None):
+    """Number of missing values in each row of ``df``.
+
+    Columns are checked one at a time and added into a single 8-bit counter
+    (wider only past 255 columns), so peak memory is one column's mask plus
+    the counter rather than a rows x columns boolean frame. Each column's
+    missing count is stored in ``col_missing`` when a dict is passed.
+    """
+    counter = np.zeros(len(df), dtype=np.min_scalar_type(len(df.columns)))
+    for col, values in df.items():
+        mask = values.isna().to_numpy()
+        counter += mask
+        if col_missing is not None:
+            col_missing[col] = int(mask.sum())
+    return counter
+
+
+def add_null_counts(nulls, other):
+    """Add the per-column counts of ``other`` (as filled by ``drop_sparse_rows``) into ``nulls``."""
+    for col, counts in other.items():
+        entry = nulls.setdefault(col, {'missing': 0, 'in_dropped_rows': 0})
+        for name, count in counts.items():
+            entry[name] += count
+    return nulls
+
+
+def print_null_contributions(nulls, top=5):
+    """Print the columns with the most missing values among the dropped rows."""
+    in_dropped = sorted(((counts['in_dropped_rows'], col) for col, counts in nulls.items()
+                         if counts['in_dropped_rows']), key=lambda item: (-item[0], item[1]))
+    if in_dropped:
+        print("Missing values in the dropped rows, by column: "
+              + ", ".join(f"'{col}' {count}" for count, col in in_dropped[:top]))
+
+
+def drop_sparse_rows(df, max_missing=MAX_MISSING_PER_ROW, verbose=True, nulls=None):
+    """Drop rows with more than ``max_missing`` missing values.
+
+    Keeps the same rows as ``df.dropna(thresh=df.shape[1] - max_missing)``
+    but counts them with ``count_missing_per_row``. When a dict is passed as
+    ``nulls``, each column's ``missing`` count and its count among the
+    dropped rows (``in_dropped_rows``) are added into it, so chunked callers
+    can total the per-column contributions.
+    """
+    if verbose:
+        print(f"Checking for rows with more than {max_missing} missing values...")
+
+    rows_before = df.shape[0]
+    col_missing = {}
+    keep = count_missing_per_row(df, col_missing) <= max_missing
+    in_dropped = {}
+    if not keep.all():
+        in_dropped = df[~keep].isna().sum().to_dict()
+        df = df[keep]
+
+    counts = {col: {'missing': missing, 'in_dropped_rows': int(in_dropped.get(col, 0))}
+              for col, missing in col_missing.items()}
+    if nulls is not None:
+        add_null_counts(nulls, counts)
+
+    if verbose:
+        rows_after = df.shape[0]
+        print(f"Dropped {rows_before - rows_after} rows for having more than {max_missing} missing values.")
+        print_null_contributions(counts)
+        print(f"New shape before imputation: {df.shape}")
+    return df
+
+
+def fill_missing(df, medians, text_cols=None):
+    """Fill numeric gaps from ``medians`` and text gaps with 'Unknown'.
+
+    ``text_cols`` defaults to the object and categorical columns of ``df``;
+    the streaming mode passes the columns that are text anywhere in the file
+    instead, since a single chunk may hold a text column that happens to be
+    entirely empty.
+    """
+    for col, median_val in medians.items():
+        if col in df.columns:
+            df[col] = df[col].fillna(median_val)
+
+    if text_cols is None:
+        text_cols = df.select_dtypes(include=['object', 'category']).columns
+    for col in text_cols:
+        if col in df.columns:
+            if isinstance(df[col].dtype, pd.CategoricalDtype) and 'Unknown' not in df[col].cat.categories:
+                df[col] = df[col].cat.add_categories('Unknown')
+            df[col] = df[col].fillna('Unknown')
+    return df
+
+
+def group_ids(df, group_cols):
+    """Dense integer group number of each row; missing keys form their own groups."""
+    return df.groupby(group_cols, observed=True, dropna=False, sort=False).ngroup().to_numpy()
+
+
+def fill_group_medians(df, numeric_cols, group_levels):
+    """Fill numeric gaps from the medians of progressively coarser groups.
+
+    ``group_levels`` is a list of column lists, finest first, e.g.
+    ``[['platform', 'vppc'], ['platform']]``. Each level numbers its groups
+    once and fills every column with one ``groupby.transform('median')``;
+    gaps whose group has no values at that level are left for the next.
+    Every level takes its medians from the values observed before any
+    filling, so a coarser median is not pulled toward the finer medians
+    already imputed. Returns per-column counts of values filled at each level.
+    """
+    filled = {col: {} for col in numeric_cols if col in df.columns}
+    observed = {col: df[col].copy() for col in filled}
+    for level in group_levels:
+        level = [col for col in level if col in df.columns]
+        if not level:
+            continue
+        gid = group_ids(df, level)
+        for col in filled:
+            missing = df[col].isna()
+            if not missing.any():
+                continue
+            group_medians = observed[col].groupby(gid).transform('median')
+            df[col] = df[col].fillna(group_medians)
+            filled[col][tuple(level)] = int(missing.sum() - df[col].isna().sum())
+    return filled
+
+
+def impute_missing(df, numeric_cols=NUMERIC_COLS, group_levels=None, medians=None, stats=None):
+    """Fill numeric gaps with medians and text gaps with 'Unknown'.
+
+    With ``group_levels`` (e.g. ``IMPUTE_GROUP_LEVELS``) numeric gaps are
+    filled from group medians first (see ``fill_group_medians``) and only
+    what is left gets the global median. ``medians`` supplies frozen
+    per-column medians instead of computing them from ``df``; the medians
+    used are recorded in ``stats['medians']`` when a dict is passed.
+    """
+    print("Attempting to fill remaining missing values...")
+
+    if medians is None:
+        medians = {col: df[col].median() for col in numeric_cols if col in df.columns}
+    elif group_levels:
+        raise ValueError("Frozen statistics hold global medians only; unset the imputation group levels.")
+    else:
+        medians = {col: median_val for col, median_val in medians.items() if col in df.columns}
+    if stats is not None:
+        stats['medians'] = {col: float(median_val) for col, median_val in medians.items()}
+    if group_levels:
+        for col, by_level in fill_group_medians(df, numeric_cols, group_levels).items():
+            for level, count in by_level.items():
+                print(f"Numeric gaps in '{col}': {count} filled with {level} group medians.")
+    df = fill_missing(df, medians)
+    for col, median_val in medians.items():
+        print(f"Numeric gaps in '{col}' filled with median: {median_val}")
+
+    print("All text gaps filled with 'Unknown'.")
+    print("Imputation step complete.")
+    return df
+
+
+def outlier_bounds(quantiles):
+    """IQR fences and percentile caps from the ``OUTLIER_QUANTILES`` of a column."""
+    q1, q3, p01, p99 = (float(q) for q in quantiles)
+    iqr = q3 - q1
+    return {
+        'lower_bound': q1 - 1.5 * iqr,
+        'upper_bound': q3 + 1.5 * iqr,
+        'p01': p01,
+        'p99': p99,
+    }
+
+
+def column_outlier_bounds(values, compression=None):
+    """``outlier_bounds`` of ``values`` from a single pass over the column.
+
+    All four quantiles are selected together (one partition rather than
+    four sorts), and match what ``Series.quantile`` returns for each. With
+    ``compression`` set they come from a ``QuantileSketch`` instead, whose
+    rank error shrinks as ``compression`` grows; the chunked cleaner builds
+    the same sketches chunk by chunk and merges them.
+    """
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    if compression is not None:
+        return outlier_bounds(QuantileSketch(compression).update(values).quantile(OUTLIER_QUANTILES))
+    if values.size == 0:
+        return outlier_bounds([np.nan] * len(OUTLIER_QUANTILES))
+    return outlier_bounds(np.quantile(values, OUTLIER_QUANTILES))
+
+
+def grouped_outlier_bounds(values, gid, min_group_size=MIN_OUTLIER_GROUP_SIZE, global_bounds=None):
+    """Per-row ``outlier_bounds`` computed within the groups numbered by ``gid``.
+
+    One ``groupby.quantile`` call yields all four quantiles of every group.
+    Groups with fewer than ``min_group_size`` non-null values take
+    ``global_bounds`` (default: the bounds of the whole column). Returns a
+    dict of row-aligned arrays and the number of groups that fell back.
+    """
+    values = pd.Series(np.asarray(values, dtype=float))
+    if global_bounds is None:
+        global_bounds = column_outlier_bounds(values.to_numpy())
+    grouped = values.groupby(gid, sort=True)
+    quantiles = grouped.quantile(OUTLIER_QUANTILES).unstack()[OUTLIER_QUANTILES].to_numpy()
+    sizes = grouped.count().to_numpy()
+
+    q1, q3, p01, p99 = quantiles.T
+    iqr = q3 - q1
+    group_bounds = {
+        'lower_bound': q1 - 1.5 * iqr,
+        'upper_bound': q3 + 1.5 * iqr,
+        'p01': p01,
+        'p99': p99,
+    }
+    small = sizes < min_group_size
+    for key, array in group_bounds.items():
+        array[small] = global_bounds[key]
+    return {key: array[gid] for key, array in group_bounds.items()}, int(small.sum())
+
+
+def clip_outliers(series, bounds):
+    """Return ``(clipped, outlier_count)`` for ``series`` under ``bounds`` (scalars or row-aligned arrays)."""
+    values = series.to_numpy(dtype=float, na_value=np.nan)
+    outlier_count = int(((values < bounds['lower_bound']) | (values > bounds['upper_bound'])).sum())
+    clipped = pd.Series(np.clip(values, bounds['p01'], bounds['p99']), index=series.index, name=series.name)
+    return clipped, outlier_count
+
+
+def cap_outliers(df, outlier_check_cols=OUTLIER_CHECK_COLS, compression=None, group_cols=None,
+                 min_group_size=MIN_OUTLIER_GROUP_SIZE, bounds=None, stats=None):
+    """Report IQR outliers and clip ``outlier_check_cols`` to their 1st/99th percentiles.
+
+    With ``group_cols`` (e.g. ``OUTLIER_GROUP_COLS``) the quantiles are
+    taken within each group, so an expensive truck repair is judged against
+    other repairs of its kind; groups under ``min_group_size`` rows fall back
+    to the global bounds. Grouped quantiles are always exact.
+
+    ``bounds`` supplies frozen ``outlier_bounds`` per column instead of
+    computing them from ``df``; the global bounds used are recorded in
+    ``stats['bounds']`` when a dict is passed.
+    """
+    print("Identifying and handling outliers...")
+
+    group_cols = [col for col in group_cols or [] if col in df.columns]
+    if group_cols and bounds is not None:
+        raise ValueError("Frozen statistics hold global outlier bounds only; unset the outlier group columns.")
+    if group_cols:
+        gid = group_ids(df, group_cols)
+        print(f"Outlier bounds computed per {tuple(group_cols)} group ({gid.max() + 1 if len(gid) else 0} groups, "
+              f"global bounds below {min_group_size} rows).")
+        for col in outlier_check_cols:
+            if col in df.columns:
+                bounds, fallback = grouped_outlier_bounds(df[col], gid, min_group_size)
+                df[col], outlier_count = clip_outliers(df[col], bounds)
+                print(f"'{col}': Found {outlier_count} potential outliers against group bounds "
+                      f"({fallback} group(s) used the global bounds).")
+                print(f"Capped '{col}' at each group's 1st and 99th percentile.")
+        print("Outlier handling complete.")
+        return df
+
+    used = {}
+    for col in outlier_check_cols:
+        if col in df.columns:
+            if bounds is None:
+                col_bounds = column_outlier_bounds(df[col].to_numpy(dtype=float, na_value=np.nan), compression)
+            elif col in bounds:
+                col_bounds = bounds[col]
+            else:
+                print(f"Warning: no frozen outlier bounds for '{col}', leaving it uncapped.")
+                continue
+            used[col] = col_bounds
+            df[col], outlier_count = clip_outliers(df[col], col_bounds)
+            print(f"'{col}': Found {outlier_count} potential outliers (values < {col_bounds['lower_bound']:.2f} or > {col_bounds['upper_bound']:.2f})")
+            print(f"Capped '{col}' at 1st percentile ({col_bounds['p01']:.2f}) and 99th percentile ({col_bounds['p99']:.2f}).")
+    if stats is not None:
+        stats['bounds'] = used
+
+    print("Outlier handling complete.")
+    return df
+
+
+def part_name_rules(consolidation_map=CONSOLIDATION_MAP, extra_rules=None):
+    """The typo fixes and ``consolidation_map`` as exact rules, plus any ``extra_rules``.
+
+    Later rules override earlier ones for the same match, so a rules file can
+    correct the built-in map.
+    """
+    rules = ConsolidationRules.from_mapping(PART_NAME_TYPO_FIXES)
+    rules.update(ConsolidationRules.from_mapping(consolidation_map))
+    if extra_rules is not None:
+        rules.update(extra_rules)
+    return rules
+
+
+def consolidate_part_names(part_names, consolidation_map=CONSOLIDATION_MAP, rules=None):
+    """Apply ``rules`` (default: ``part_name_rules(consolidation_map)``) to each distinct part name."""
+    if rules is None:
+        rules = part_name_rules(consolidation_map)
+    return rules.apply(part_names)
+
+
+def consolidate_categories(df, consolidation_map=CONSOLIDATION_MAP, rules=None):
+    print("Standardizing categorical values...")
+
+    if 'causal_part_nm' in df.columns:
+        df['causal_part_nm'] = consolidate_part_names(df['causal_part_nm'], consolidation_map, rules)
+        print(f"Unique 'black' steering wheel parts after: {df[df['causal_part_nm'].str.contains('black')]['causal_part_nm'].nunique()}")
+        print("Categorical standardization complete.")
+    else:
+        print("'causal_part_nm' column not found, skipping standardization.")
+    return df
+
+
+def save_parquet(df, file_name=CLEANED_PARQUET_FILE_NAME):
+    if importlib.util.find_spec('pyarrow') is None:
+        print(f"Warning: pyarrow is not installed, skipping '{file_name}'.")
+        return None
+
+    df.to_parquet(file_name, index=False, engine='pyarrow')
+    print(f"Successfully saved cleaned data to '{file_name}'")
+    return file_name
+
+
+def load_cleaned(file_name, columns=None):
+    """Load a cleaned CSV or Parquet file, optionally only ``columns``.
+
+    Requested columns that the file does not have are skipped rather than
+    treated as an error.
+    """
+    print(f"Loading cleaned data from: {file_name}")
+    try:
+        if str(file_name).endswith('.parquet'):
+            return _read_parquet_columns(file_name, columns)
+        usecols = None if columns is None else (lambda col: col in columns)
+        return pd.read_csv(file_name, usecols=usecols)
+    except FileNotFoundError:
+        print(f"Error: The file '{file_name}' was not found.")
+        print("Please make sure this script is in the same folder as the CSV file.")
+    except Exception as e:
+        print(f"An error occurred while reading the file: {e}")
+    return None
+
+
+def _read_parquet_columns(file_name, columns):
+    if columns is not None:
+        import pyarrow.parquet as pq
+
+        available = set(pq.read_schema(file_name).names)
+        columns = [col for col in columns if col in available]
+    return pd.read_parquet(file_name, columns=columns)
+
+
+def file_digest(file_name, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(file_name, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_statistics(file_name=STATISTICS_FILE_NAME):
+    with open(file_name, encoding='utf-8') as f:
+        return json.load(f)
+
+
+class CleaningPipeline:
+    """Single-pass cleaning of the raw repairs extract.
+
+    Runs load -> standardize -> clean -> type -> filter -> impute -> cap ->
+    consolidate once and keeps the result in ``df_cleaned`` so the charts and
+    the TF-IDF tagger can share it.
+
+    The outputs of ``cache_stages`` are pickled under ``cache_dir`` (see
+    ``stage_cache.StageCache``). Each stage's key chains the input file
+    digest, the parameters of that stage and of every stage before it, and
+    ``PIPELINE_VERSION``, so a re-run resumes after the last stage whose
+    inputs are unchanged: an unchanged input and config skips the cleaning
+    entirely, and a new ``outlier_check_cols`` re-runs only impute, cap and
+    consolidate. Least recently used entries are evicted once the cache
+    exceeds ``cache_max_bytes``. ``nlp_tags`` caches the TF-IDF tags the
+    same way, on top of the cleaned key. Pass ``input_digest`` when the
+    input's ``file_digest`` is already known, so it is not read twice.
+
+    With ``workers`` other than 1 the row-local stages (clean, type, filter)
+    run in a process pool over row partitions; ``None`` uses every CPU. The
+    result is the same either way, so it is not part of the cache key.
+
+    Pass ``stage_log`` (a path or an open text stream) to record each
+    stage's elapsed time, rows in/out, memory delta and changed values as
+    JSON lines; see ``instrumentation.StageRecorder``.
+
+    ``consolidation_rules`` adds exact, prefix and pattern rules for
+    ``causal_part_nm`` on top of ``consolidation_map``, either as a
+    ``ConsolidationRules`` or the path of a rules CSV (see
+    ``consolidation.load_rules``).
+
+    Outlier quantiles are exact by default; ``outlier_compression`` takes
+    them from a ``QuantileSketch`` of that compression instead.
+    ``outlier_group_cols`` switches to per-group caps (see ``cap_outliers``)
+    and ``impute_group_levels`` to group-wise medians (see ``impute_missing``).
+
+    After a run, ``save_statistics`` writes the medians, outlier bounds,
+    consolidation rules and TF-IDF vocabulary it used. A pipeline created
+    with ``statistics`` (that file, or the loaded dict) is in apply mode: it
+    cleans a new batch against those frozen values instead of recomputing
+    them, so a transaction is cleaned the same way whichever batch it
+    arrives in.
+
+    With ``compact=True`` a final stage converts the cleaned frame to compact
+    dtypes (narrow integers, categoricals, Arrow strings) and reports the
+    memory saved; see ``compaction.compact_frame``.
+    """
+
+    STAGES = ('load', 'standardize', 'clean', 'type', 'filter', 'impute', 'cap', 'consolidate')
+
+    def __init__(self, file_name=RAW_FILE_NAME, cache_dir=CACHE_DIR, use_cache=True,
+                 text_cols=TEXT_COLS_TO_CLEAN, numeric_cols=NUMERIC_COLS,
+                 outlier_check_cols=OUTLIER_CHECK_COLS, consolidation_map=CONSOLIDATION_MAP,
+                 max_missing=MAX_MISSING_PER_ROW, workers=1, stage_log=None, consolidation_rules=None,
+                 outlier_compression=None, outlier_group_cols=None,
+                 min_outlier_group_size=MIN_OUTLIER_GROUP_SIZE, impute_group_levels=None, statistics=None,
+                 cache_stages=CACHED_STAGES, cache_max_bytes=CACHE_MAX_BYTES, compact=False, date_format=None,
+                 input_digest=None):
+        self.file_name = file_name
+        self.cache_dir = cache_dir
+        self.use_cache = use_cache
+        self.cache_stages = set(cache_stages)
+        self.cache = StageCache(cache_dir, cache_max_bytes)
+        self.text_cols = list(text_cols)
+        self.numeric_cols = list(numeric_cols)
+        self.outlier_check_cols = list(outlier_check_cols)
+        self.consolidation_map = dict(consolidation_map)
+        if isinstance(consolidation_rules, (str, os.PathLike)):
+            consolidation_rules = load_rules(consolidation_rules)
+        self.consolidation_rules = consolidation_rules
+        self.max_missing = max_missing
+        self.outlier_compression = outlier_compression
+        self.outlier_group_cols = list(outlier_group_cols) if outlier_group_cols else None
+        self.min_outlier_group_size = min_outlier_group_size
+        self.impute_group_levels = [list(level) for level in impute_group_levels] if impute_group_levels else None
+        if isinstance(statistics, (str, os.PathLike)):
+            statistics = load_statistics(statistics)
+        self.statistics = statistics
+        self.date_format = date_format or (statistics or {}).get('dates', {}).get('format')
+        self.fitted_statistics = None
+        self._input_digest = input_digest
+        self.workers = workers
+        self.stages = self.STAGES + ('compact',) if compact else self.STAGES
+        self.recorder = StageRecorder(stage_log, source=file_name)
+        self.df_cleaned = None
+
+    def stage_params(self):
+        """The parameters each stage's output depends on, by stage."""
+        frozen = self.statistics or {}
+        return {
+            'load': None,
+            'standardize': None,
+            'clean': self.text_cols,
+            'type': [self.numeric_cols, self.date_format],
+            'filter': self.max_missing,
+            'impute': [self.numeric_cols, self.impute_group_levels, frozen.get('medians')],
+            'cap': [self.outlier_check_cols, self.outlier_compression, self.outlier_group_cols,
+                    self.min_outlier_group_size, frozen.get('bounds')],
+            'consolidate': self.part_name_rules().records(),
+            'compact': None,
+        }
+
+    def part_name_rules(self):
+        if self.statistics is not None:
+            return ConsolidationRules(self.statistics['consolidation_rules'])
+        return part_name_rules(self.consolidation_map, self.consolidation_rules)
+
+    def input_digest(self):
+        if self._input_digest is None:
+            self._input_digest = file_digest(self.file_name)
+        return self._input_digest
+
+    def stage_keys(self):
+        key = self.input_digest()
+        keys = {}
+        params = self.stage_params()
+        for stage in self.stages:
+            key = keys[stage] = stage_key(key, stage, params[stage], PIPELINE_VERSION)
+        return keys
+
+    def cache_key(self):
+        """Key of the cleaned frame; downstream caches chain from it."""
+        return self.stage_keys()[self.stages[-1]]
+
+    def run(self):
+        if self.df_cleaned is not None:
+            return self.df_cleaned
+
+        stats = {}
+        df = self._run_stages(self.stage_keys() if self.use_cache else {}, stats)
+        self.fitted_statistics = self._statistics_artifact(stats, len(df))
+        self.df_cleaned = df
+        return df
+
+    def _resume(self, keys, stats):
+        """The index of the first stage to run and the cached frame it starts from.
+
+        The statistics cached with that frame are added into ``stats``.
+        """
+        for i in range(len(self.stages), 0, -1):
+            stage = self.stages[i - 1]
+            if keys and stage in self.cache_stages:
+                try:
+                    df, cached_stats = self.cache.load(stage, keys[stage])
+                except KeyError:
+                    continue
+                stats.update(cached_stats)
+                return i, df
+        return 0, None
+
+    def _run_stages(self, keys, stats):
+        start, df = self._resume(keys, stats)
+        if start == len(self.stages):
+            last = self.stages[-1]
+            print(f"Loaded cleaned data from cache '{self.cache.path(last, keys[last])}'. Shape: {df.shape}")
+            return df
+        if start:
+            print(f"Resuming after the cached '{self.stages[start - 1]}' stage.")
+
+        frozen = self.statistics or {}
+        if self.statistics is not None:
+            print(f"Applying frozen cleaning statistics from '{frozen.get('source')}' "
+                  f"(fitted {frozen.get('created')}).")
+        steps = {
+            'load': lambda df: load_raw(self.file_name),
+            'standardize': standardize_columns,
+            'clean': lambda df: clean_text_columns(df, self.text_cols),
+            'type': lambda df: correct_types(df, self.numeric_cols, date_format=self.date_format,
+                                             dates=stats.setdefault('dates', {})),
+            'filter': lambda df: drop_sparse_rows(df, self.max_missing, nulls=stats.setdefault('nulls', {})),
+            'impute': lambda df: impute_missing(df, self.numeric_cols, self.impute_group_levels,
+                                                frozen.get('medians'), stats),
+            'cap': lambda df: cap_outliers(df, self.outlier_check_cols, self.outlier_compression,
+                                           self.outlier_group_cols, self.min_outlier_group_size,
+                                           frozen.get('bounds'), stats),
+            'consolidate': lambda df: consolidate_categories(df, rules=self.part_name_rules()),
+            'compact': compact_frame,
+        }
+
+        i = start
+        while i < len(self.stages):
+            stage = self.stages[i]
+            if stage == 'clean' and self.workers != 1:
+                from .parallel import clean_rows_parallel
+                nulls, dates = stats.setdefault('nulls', {}), stats.setdefault('dates', {})
+                df = self.recorder.run('clean+type+filter',
+                                       lambda: clean_rows_parallel(df, self, self.workers, nulls, dates), df)
+                stage = 'filter'
+                i = self.stages.index(stage)
+            else:
+                df = self.recorder.run(stage, lambda: steps[stage](df), df)
+            if keys and stage in self.cache_stages:
+                self.cache.store(stage, keys[stage], (df, stats))
+            i += 1
+
+        print("\n" + "=" * 30)
+        print("Data Cleaning Complete. Final DataFrame Info:")
+        df.info()
+        return df
+
+    def _statistics_artifact(self, stats, rows):
+        return {
+            'version': PIPELINE_VERSION,
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'source': os.path.basename(self.file_name),
+            'source_digest': self.input_digest(),
+            'rows': rows,
+            'grouped': bool(self.impute_group_levels or self.outlier_group_cols),
+            'medians': stats.get('medians', {}),
+            'bounds': stats.get('bounds', {}),
+            'nulls': stats.get('nulls', {}),
+            'dates': stats.get('dates', {}),
+            'consolidation_rules': [list(rule) for rule in self.part_name_rules().records()],
+        }
+
+    def save_statistics(self, file_name=STATISTICS_FILE_NAME, model_dir=None):
+        """Write the statistics the cleaning used, for ``CleaningPipeline(statistics=...)``.
+
+        Holds the global medians, IQR bounds and p01/p99 caps, the part-name
+        consolidation rules, and the vocabulary and version of the latest
+        TF-IDF tag model in ``model_dir`` (``tagging.MODEL_DIR`` by default),
+        so a batch can be cleaned and tagged exactly as the fitted data was.
+        Grouped imputation and capping keep per-group statistics that are
+        not persisted, so they cannot be frozen.
+        """
+        from .tagging import MODEL_DIR, load_model_manifest
+
+        self.run()
+        artifact = dict(self.fitted_statistics)
+        if artifact.pop('grouped'):
+            raise ValueError("Grouped imputation or outlier capping cannot be frozen; fit without "
+                             "impute_group_levels and outlier_group_cols to save statistics.")
+        manifest = load_model_manifest(model_dir or MODEL_DIR)
+        artifact['tfidf'] = None if manifest is None else {
+            'version': manifest['version'],
+            'vocabulary': manifest['vocabulary'],
+        }
+        with open(file_name, 'w', encoding='utf-8') as f:
+            json.dump(artifact, f, indent=2)
+        print(f"Saved cleaning statistics to '{file_name}'")
+        return file_name
+
+    def nlp_tags(self, max_features=None, ngram_range=None):
+        """``tagging.generate_nlp_tags`` on the cleaned frame, cached like a stage.
+
+        The key chains the cleaned frame's key with ``max_features`` and
+        ``ngram_range``, so trying another TF-IDF setting neither re-cleans
+        nor refits settings already tried.
+        """
+        from .tagging import MAX_FEATURES, NGRAM_RANGE, generate_nlp_tags
+
+        df = self.run()
+        max_features = max_features or MAX_FEATURES
+        ngram_range = tuple(ngram_range or NGRAM_RANGE)
+        if not self.use_cache:
+            return self.recorder.run('tags', lambda: generate_nlp_tags(df, max_features, ngram_range), df)
+
+        key = stage_key(self.cache_key(), 'tags', [max_features, ngram_range], PIPELINE_VERSION)
+        try:
+            tags = self.cache.load('tags', key)
+        except KeyError:
+            tags = self.recorder.run('tags', lambda: generate_nlp_tags(df, max_features, ngram_range), df)
+            self.cache.store('tags', key, tags)
+        else:
+            print(f"Loaded NLP tags from cache '{self.cache.path('tags', key)}'")
+        return tags
+
+    def stream(self, output_file=CLEANED_FILE_NAME, chunksize=None, compression=None):
+        """Clean the input in bounded memory, writing straight to ``output_file``.
+
+        Unlike ``run`` nothing is kept in memory; see ``streaming.stream_clean``.
+        ``compression`` sets the size, and so the error bound, of the quantile
+        sketches behind the medians and outlier caps. The stages run chunk by
+        chunk, interleaved, so there are no per-stage records for ``stage_log``.
+        """
+        if self.recorder.log_file is not None:
+            raise ValueError("stage_log records whole-frame stages and is not supported by stream().")
+        from .streaming import CHUNKSIZE, SKETCH_COMPRESSION, stream_clean
+        return stream_clean(self, output_file, chunksize or CHUNKSIZE, compression or SKETCH_COMPRESSION)
+
+    def save(self, file_name=CLEANED_FILE_NAME, parquet_file=CLEANED_PARQUET_FILE_NAME):
+        """Write the cleaned frame to CSV and, if pyarrow is available, Parquet.
+
+        The Parquet copy keeps the dtypes (dates, nullable integers,
+        dictionary-encoded categoricals) so readers such as
+        ``analyze_repairs`` can load just the columns they need without
+        re-parsing the CSV. Pass ``parquet_file=None`` to skip it.
+        """
+        df = self.run()
+        self.recorder.run('save', lambda: self._write(df, file_name, parquet_file), df)
+        return file_name
+
+    def _write(self, df, file_name, parquet_file):
+        df.to_csv(file_name, index=False, encoding='utf-8')
+
+        print("\n" + "=" * 30)
+        print(f"Successfully saved cleaned data to '{file_name}'")
+
+        if parquet_file:
+            save_parquet(df, parquet_file)
@@ -0,0 +1,137 @@
+import re
+from difflib import SequenceMatcher
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from .consolidation import RULE_FIELDS
+
+CANDIDATES_FILE_NAME = 'part_name_rule_candidates.csv'
+
+SIMILARITY_THRESHOLD = 0.6
+MAX_BLOCK_SIZE = 1_000
+NGRAM_RANGE = (2, 4)
+
+_BLOCK_KEY_RE = re.compile(r'[a-z0-9]+')
+
+
+def block_key(value):
+    """Blocking key of a part name: its first alphanumeric token ('wheel' for 'wheel,strg *black')."""
+    match = _BLOCK_KEY_RE.search(value)
+    return match.group() if match else ''
+
+
+def iter_blocks(names, max_block_size=MAX_BLOCK_SIZE):
+    """Yield arrays of positions into ``names`` that are compared with each other.
+
+    Names sharing a block key form a block; a block larger than
+    ``max_block_size`` is sorted and cut into consecutive windows, so
+    similar spellings (which sort near each other) still meet. Only pairs
+    within a block are scored, which bounds the work at
+    ``len(names) * max_block_size`` instead of ``len(names) ** 2``.
+    """
+    keys = pd.Series([block_key(name) for name in names])
+    for positions in keys.groupby(keys, sort=False).indices.values():
+        if len(positions) < 2:
+            continue
+        if len(positions) <= max_block_size:
+            yield positions
+            continue
+        positions = positions[np.argsort(np.asarray(names, dtype=object)[positions], kind='stable')]
+        for start in range(0, len(positions), max_block_size):
+            window = positions[start:start + max_block_size]
+            if len(window) > 1:
+                yield window
+
+
+def _assign_leaders(similarity, threshold):
+    """Greedy leader clustering over a block ordered from most to least frequent name.
+
+    Each name joins the most similar earlier leader scoring at least
+    ``threshold``, or becomes a leader itself. Linking to leaders only (not
+    to any member) stops chains of small edits from merging distinct parts.
+    """
+    n = len(similarity)
+    leader_of = np.arange(n)
+    scores = np.ones(n)
+    leaders = [0]
+    for i in range(1, n):
+        sims = similarity[i, leaders]
+        best = int(np.argmax(sims))
+        if sims[best] >= threshold:
+            leader_of[i] = leaders[best]
+            scores[i] = sims[best]
+        else:
+            leaders.append(i)
+    return leader_of, scores
+
+
+def cluster_part_names(part_names, threshold=SIMILARITY_THRESHOLD, max_block_size=MAX_BLOCK_SIZE,
+                       ngram_range=NGRAM_RANGE):
+    """Group near-duplicate part names and propose a consolidation rule for each variant.
+
+    Distinct names are embedded as TF-IDF weighted character n-grams (so
+    "*very dark at" stays close to "*very dark atmosphere" and "blackk" to
+    "black"), blocked with ``iter_blocks`` and compared by cosine similarity
+    within each block. Each cluster is named after its most frequent
+    spelling. Returns a frame with one row per proposed rule: ``kind``,
+    ``match``, ``replacement``, the n-gram ``similarity`` of the pair, its
+    ``edit_similarity`` (difflib ratio, for review) and how many rows carry
+    each spelling, ordered by rows affected.
+
+    These are candidates, not rules: colour variants of one part ("*vulcan",
+    "*synthesis") can score as high as genuine typos, so review the file
+    before passing it to ``CleaningPipeline(consolidation_rules=...)``.
+    """
+    counts = pd.Series(part_names).dropna().astype(str).value_counts()
+    counts = counts.iloc[np.lexsort((counts.index.to_numpy(), -counts.to_numpy()))]
+    columns = RULE_FIELDS + ['similarity', 'edit_similarity', 'match_count', 'replacement_count']
+    if len(counts) < 2:
+        return pd.DataFrame(columns=columns)
+
+    names = counts.index.to_numpy(dtype=object)
+    vectors = TfidfVectorizer(analyzer='char_wb', ngram_range=ngram_range, lowercase=False).fit_transform(names)
+
+    rules = []
+    for positions in iter_blocks(names, max_block_size):
+        positions = np.sort(positions)  # most frequent first
+        block = vectors[positions]
+        similarity = (block @ block.T).toarray()
+        leader_of, scores = _assign_leaders(similarity, threshold)
+        for member, leader in enumerate(leader_of):
+            if leader != member:
+                rules.append((positions[member], positions[leader], scores[member]))
+
+    candidates = pd.DataFrame(
+        [('exact', names[m], names[r], round(float(s), 4),
+          round(SequenceMatcher(None, names[m], names[r]).ratio(), 4), int(counts.iloc[m]), int(counts.iloc[r]))
+         for m, r, s in rules],
+        columns=columns,
+    )
+    return candidates.sort_values(['match_count', 'similarity'], ascending=False, ignore_index=True)
+
+
+def save_candidates(candidates, file_name=CANDIDATES_FILE_NAME):
+    """Write proposed rules for review; the file loads with ``consolidation.load_rules`` as is."""
+    candidates.to_csv(file_name, index=False, encoding='utf-8')
+    print(f"Saved {len(candidates)} candidate consolidation rules to '{file_name}'")
+    return file_name
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from .cleaning import CLEANED_FILE_NAME, load_cleaned
+
+    parser = argparse.ArgumentParser(description="Propose consolidation rules for near-duplicate part names.")
+    parser.add_argument('--input', default=CLEANED_FILE_NAME, help="cleaned Parquet or CSV file")
+    parser.add_argument('--output', default=CANDIDATES_FILE_NAME)
+    parser.add_argument('--column', default='causal_part_nm')
+    parser.add_argument('--threshold', type=float, default=SIMILARITY_THRESHOLD)
+    args = parser.parse_args()
+
+    df = load_cleaned(args.input, [args.column])
+    if df is None:
+        raise SystemExit(1)
+    save_candidates(cluster_part_names(df[args.column], args.threshold), args.output)
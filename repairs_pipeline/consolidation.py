@@ -0,0 +1,158 @@
+import csv
+import re
+
+import numpy as np
+import pandas as pd
+
+RULE_KINDS = ('exact', 'prefix', 'pattern')
+RULE_FIELDS = ['kind', 'match', 'replacement']
+
+_END = object()
+
+
+def map_unique(series, func):
+    """Apply ``func`` to each distinct non-null value of ``series`` and map the results back.
+
+    The column is factorized once, so the cost of ``func`` is proportional to
+    the number of distinct values, not rows. ``func`` takes and returns a
+    numpy object array of the unique values. Missing values stay missing and
+    categorical columns come back categorical.
+    """
+    codes, uniques = pd.factorize(series)
+    if len(uniques) == 0:
+        return series
+    return from_codes(series, codes, func(np.asarray(uniques, dtype=object)))
+
+
+def from_codes(series, codes, mapped):
+    """Expand per-unique ``mapped`` values back to the rows of ``series`` through ``codes``.
+
+    ``codes`` come from ``pd.factorize(series)``; ``-1`` marks a missing value.
+    """
+    values = np.append(np.asarray(mapped, dtype=object), np.nan)[codes]
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        values = pd.Categorical(values)
+    return pd.Series(values, index=series.index, name=series.name)
+
+
+class ConsolidationRules:
+    """Exact, prefix and pattern rewrite rules for categorical values.
+
+    * ``exact`` replaces a value equal to ``match``.
+    * ``prefix`` replaces any value starting with ``match``, so truncated
+      colour suffixes ("*dark titaniu") can be pinned to one name. The
+      longest matching prefix wins; prefixes are held in a character trie so
+      lookup cost does not grow with the number of prefix rules.
+    * ``pattern`` replaces values the regular expression ``match`` matches
+      in full. ``replacement`` may use group references (``\\1``).
+
+    Exact rules take precedence over prefix rules, which take precedence over
+    pattern rules (tried in the order added). Rules are not chained: a value
+    is rewritten at most once. Re-adding a ``match`` of the same kind
+    replaces the earlier rule.
+    """
+
+    def __init__(self, rules=()):
+        self._exact = {}
+        self._prefixes = {}
+        self._trie = {}
+        self._patterns = {}
+        for kind, match, replacement in rules:
+            self.add(kind, match, replacement)
+
+    @classmethod
+    def from_mapping(cls, mapping, kind='exact'):
+        return cls((kind, match, replacement) for match, replacement in mapping.items())
+
+    def add(self, kind, match, replacement):
+        if kind == 'exact':
+            self._exact[match] = replacement
+        elif kind == 'prefix':
+            self._prefixes[match] = replacement
+            node = self._trie
+            for char in match:
+                node = node.setdefault(char, {})
+            node[_END] = replacement
+        elif kind == 'pattern':
+            self._patterns[match] = (re.compile(match), replacement)
+        else:
+            raise ValueError(f"Unknown rule kind '{kind}'; expected one of {RULE_KINDS}.")
+        return self
+
+    def update(self, other):
+        for rule in other.records():
+            self.add(*rule)
+        return self
+
+    def records(self):
+        """The rules as ``(kind, match, replacement)`` tuples, exact then prefix then pattern."""
+        return ([('exact', match, rep) for match, rep in self._exact.items()]
+                + [('prefix', match, rep) for match, rep in self._prefixes.items()]
+                + [('pattern', match, rep) for match, (_, rep) in self._patterns.items()])
+
+    def __len__(self):
+        return len(self._exact) + len(self._prefixes) + len(self._patterns)
+
+    def _longest_prefix(self, value):
+        node, found = self._trie, None
+        for char in value:
+            node = node.get(char)
+            if node is None:
+                break
+            found = node.get(_END, found)
+        return found
+
+    def lookup(self, value):
+        """The replacement for ``value``, or ``None`` when no rule applies."""
+        if not isinstance(value, str):
+            return None
+        if value in self._exact:
+            return self._exact[value]
+        if self._trie:
+            replacement = self._longest_prefix(value)
+            if replacement is not None:
+                return replacement
+        for regex, replacement in self._patterns.values():
+            match = regex.fullmatch(value)
+            if match:
+                return match.expand(replacement)
+        return None
+
+    def rewrite(self, values):
+        """Rewrite an array of distinct values; values no rule matches are kept."""
+        out = values.copy()
+        for i, value in enumerate(values):
+            replacement = self.lookup(value)
+            if replacement is not None:
+                out[i] = replacement
+        return out
+
+    def apply(self, series):
+        """Rewrite ``series``, looking up each distinct value once."""
+        if not len(self):
+            return series
+        return map_unique(series, self.rewrite)
+
+
+def load_rules(file_name):
+    """Read rules from a CSV file with ``kind,match,replacement`` columns.
+
+    ``kind`` may be left empty for an exact rule. Values containing commas or
+    quotes follow the usual CSV quoting (double the quote characters).
+    """
+    rules = ConsolidationRules()
+    with open(file_name, encoding='utf-8', newline='') as f:
+        for line_no, row in enumerate(csv.DictReader(f), start=2):
+            try:
+                rules.add((row['kind'] or 'exact').strip(), row['match'], row['replacement'])
+            except (KeyError, ValueError, re.error) as e:
+                raise ValueError(f"{file_name}, line {line_no}: {e}") from e
+    return rules
+
+
+def save_rules(rules, file_name):
+    with open(file_name, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(RULE_FIELDS)
+        writer.writerows(rules.records())
+    return file_name
@@ -0,0 +1,110 @@
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+
+
+def current_rss_mb():
+    """Resident set size of this process in MB, or ``None`` where /proc is unavailable."""
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+
+
+def count_changed(before, after):
+    """Number of positions where ``after`` differs from ``before``; missing equals missing."""
+    if before is after:
+        return 0
+    if before.dtype != after.dtype:
+        before, after = before.astype(object), after.astype(object)
+    same = (before == after) | (before.isna() & after.isna())
+    return int(len(same) - same.to_numpy(dtype=bool, na_value=False).sum())
+
+
+def _changed_by_column(before_cols, after):
+    """Per-column changed-value counts between a snapshot of columns and ``after``.
+
+    Columns are paired by position when the column count is unchanged (so a
+    rename is not a change) and by name otherwise. When rows were dropped
+    only the surviving rows are compared.
+    """
+    before_index = before_cols[0][1].index if before_cols else after.index
+    positions = None
+    if not before_index.equals(after.index):
+        positions = before_index.get_indexer(after.index)
+
+    if len(before_cols) == len(after.columns):
+        pairs = zip(before_cols, after.items())
+    else:
+        before_by_name = dict(before_cols)
+        pairs = (((name, before_by_name[name]), (name, col))
+                 for name, col in after.items() if name in before_by_name)
+
+    changed = {}
+    for (_, before), (name, col) in pairs:
+        if positions is not None:
+            before = before.iloc[positions].set_axis(col.index)
+        n = count_changed(before, col)
+        if n:
+            changed[name] = n
+    return changed
+
+
+class StageRecorder:
+    """Time each pipeline stage and log what it did as one JSON line.
+
+    Each record holds the stage name, elapsed seconds, rows in and out, the
+    change in process RSS and the number of values the stage changed, in
+    total and per column. Records go to ``log_file`` (a path, appended to,
+    or an open text stream) and are kept in ``records``. With
+    ``log_file=None`` stages run untouched and nothing is recorded, so the
+    before/after comparison costs nothing unless asked for.
+    """
+
+    def __init__(self, log_file=None, source=None):
+        self.log_file = log_file
+        self.source = source
+        self.records = []
+
+    def run(self, stage, func, df=None):
+        """Run ``func`` as ``stage``; ``df`` is the frame it receives, if any."""
+        if self.log_file is None:
+            return func()
+
+        before_cols = list(df.items()) if df is not None else []
+        rows_in = len(df) if df is not None else None
+        rss_before = current_rss_mb()
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        rss_after = current_rss_mb()
+
+        after = result if isinstance(result, pd.DataFrame) else df
+        changed = _changed_by_column(before_cols, after) if df is not None and after is not None else {}
+        record = {
+            'time': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'source': self.source,
+            'stage': stage,
+            'seconds': round(elapsed, 4),
+            'rows_in': rows_in,
+            'rows_out': len(after) if after is not None else None,
+            'rss_delta_mb': None if rss_before is None else round(rss_after - rss_before, 1),
+            'values_changed': sum(changed.values()),
+            'changed_by_column': changed,
+        }
+        self.records.append(record)
+        self._emit(record)
+        return result
+
+    def _emit(self, record):
+        line = json.dumps(record, default=str) + '\n'
+        if hasattr(self.log_file, 'write'):
+            self.log_file.write(line)
+        else:
+            with open(self.log_file, 'a', encoding='utf-8') as f:
+                f.write(line)
@@ -0,0 +1,102 @@
+import functools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .cleaning import (
+    add_date_report,
+    add_null_counts,
+    clean_text_columns,
+    correct_types,
+    drop_sparse_rows,
+    print_date_report,
+    print_null_contributions,
+)
+from .parsing import detect_date_format
+
+PARTITIONS_PER_WORKER = 4
+MIN_PARTITION_ROWS = 10_000
+
+
+def resolve_workers(workers):
+    """``None`` or ``0`` means one worker per CPU."""
+    return max(1, workers or os.cpu_count() or 1)
+
+
+def partition_bounds(n_rows, n_partitions):
+    """``(start, stop)`` row positions splitting ``n_rows`` into contiguous, near-equal partitions."""
+    edges = np.linspace(0, n_rows, max(1, n_partitions) + 1).astype(int)
+    return [(int(start), int(stop)) for start, stop in zip(edges[:-1], edges[1:]) if stop > start]
+
+
+def _clean_partition(partition, text_cols, numeric_cols, max_missing, date_format):
+    coerced = {}
+    nulls = {}
+    dates = {}
+    rows_in = len(partition)
+    partition = clean_text_columns(partition, text_cols, verbose=False)
+    partition = correct_types(partition, numeric_cols, verbose=False, coerced=coerced, date_format=date_format,
+                              dates=dates)
+    partition = drop_sparse_rows(partition, max_missing, verbose=False, nulls=nulls)
+    return partition, coerced, nulls, dates, rows_in
+
+
+def clean_rows_parallel(df, pipeline, workers=None, nulls=None, dates=None):
+    """Run the row-local stages of ``pipeline`` (clean, type, filter) on ``df`` in a process pool.
+
+    The frame is cut into contiguous row partitions, a few per worker so a
+    slow partition does not hold up the rest, and results are concatenated
+    in partition order, so the original row order and index are kept. Each
+    row only depends on its own values in these stages, which makes the
+    output identical to running them serially. The stages that need column
+    statistics (impute, cap) run afterwards over the reassembled frame.
+    Per-column missing counts are totalled into ``nulls`` as
+    ``drop_sparse_rows`` does. The date format is detected once on the whole
+    frame, not per partition, and the date reports are totalled into ``dates``.
+    """
+    workers = resolve_workers(workers)
+    n_partitions = min(workers * PARTITIONS_PER_WORKER, max(1, len(df) // MIN_PARTITION_ROWS))
+    bounds = partition_bounds(len(df), n_partitions) or [(0, 0)]
+    print(f"Cleaning {len(df)} rows in {len(bounds)} partition(s) across {workers} worker(s)...")
+
+    date_report = {'format': pipeline.date_format}
+    if pipeline.date_format is None and 'repair_date' in df.columns:
+        date_report['format'], tied = detect_date_format(df['repair_date'].drop_duplicates())
+        date_report['format_ambiguous'] = bool(tied)
+
+    clean = functools.partial(_clean_partition, text_cols=pipeline.text_cols, numeric_cols=pipeline.numeric_cols,
+                              max_missing=pipeline.max_missing, date_format=date_report['format'])
+    if workers == 1 or len(bounds) == 1:
+        results = [clean(df)]
+    else:
+        partitions = (df.iloc[start:stop] for start, stop in bounds)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(clean, partitions))
+
+    coerced = {}
+    null_counts = {}
+    for _, partition_coerced, partition_nulls, partition_dates, _ in results:
+        for col, count in partition_coerced.items():
+            coerced[col] = coerced.get(col, 0) + count
+        add_null_counts(null_counts, partition_nulls)
+        add_date_report(date_report, partition_dates)
+    if nulls is not None:
+        add_null_counts(nulls, null_counts)
+    if dates is not None:
+        add_date_report(dates, date_report)
+    df = pd.concat([partition for partition, _, _, _, _ in results])
+
+    print("Text cleaning complete.")
+    for col, count in coerced.items():
+        if count:
+            print(f"'{col}': {count} value(s) could not be parsed as numbers and were set to NaN.")
+    if 'repair_date' in df.columns:
+        print_date_report(date_report)
+    print("Data types corrected. Any conversion errors are marked as NaN/NaT.")
+    rows_before = sum(rows_in for _, _, _, _, rows_in in results)
+    print(f"Dropped {rows_before - len(df)} rows for having more than {pipeline.max_missing} missing values.")
+    print_null_contributions(null_counts)
+    print(f"New shape before imputation: {df.shape}")
+    return df
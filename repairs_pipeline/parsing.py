@@ -0,0 +1,108 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+CURRENCY_SYMBOLS = '$€£¥₹'
+
+_PARENTHESIZED_RE = re.compile(r'^\((.*)\)$')
+
+
+def parse_numeric(series, thousands=',', decimal='.', currency_symbols=CURRENCY_SYMBOLS):
+    """Convert ``series`` to numbers, tolerating formatted values.
+
+    Handles thousands separators ("8,872"), currency symbols ("$1,204.50"),
+    parenthesized negatives ("(35.00)") and surrounding whitespace, all
+    through vectorized ``.str`` operations. Columns that are already numeric
+    are returned untouched. Returns ``(parsed, coerced)`` where ``coerced``
+    is the number of non-empty values that still could not be converted and
+    became NaN.
+    """
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return series, 0
+
+    present = series.notna().to_numpy()
+    text = series[present].astype(str)
+    text = text.str.replace(f'[{re.escape(currency_symbols)}\\s]', '', regex=True)
+    text = text.str.replace(_PARENTHESIZED_RE, r'-\1', regex=True)
+    if thousands:
+        text = text.str.replace(thousands, '', regex=False)
+    if decimal != '.':
+        text = text.str.replace(decimal, '.', regex=False)
+    non_empty = (text != '').to_numpy()
+
+    positions = np.flatnonzero(present)[non_empty]
+    values = np.full(len(series), np.nan)
+    values[positions] = pd.to_numeric(text[non_empty], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    coerced = int(np.isnan(values[positions]).sum())
+    return pd.Series(values, index=series.index, name=series.name), coerced
+
+
+# Candidate layouts for date columns, tried in order. The extract is
+# month-first ("01-31-2024"), so when a sample fits both month-first and
+# day-first the month-first layout wins.
+DATE_FORMATS = ['%m-%d-%Y', '%d-%m-%Y', '%m/%d/%Y', '%d/%m/%Y', '%Y-%m-%d', '%Y/%m/%d', '%m-%d-%y', '%d-%m-%y']
+DATE_SAMPLE_SIZE = 1_000
+
+
+def detect_date_format(values, formats=DATE_FORMATS, sample_size=DATE_SAMPLE_SIZE):
+    """Return ``(format, tied)``: the first of ``formats`` parsing the most of a sample of ``values``.
+
+    ``values`` are strings, ideally distinct; up to ``sample_size`` non-empty
+    ones are tried against every format. ``tied`` lists the other formats
+    that parse the sample just as well, such as day-first when no day in the
+    sample is above 12. ``format`` is ``None`` when nothing parses.
+    """
+    values = pd.Series(values, dtype=object)
+    sample = values[values.notna() & (values != '')].head(sample_size)
+    scores = [int(pd.to_datetime(sample, format=fmt, errors='coerce').notna().sum()) for fmt in formats]
+    best = max(scores, default=0)
+    if best == 0:
+        return None, []
+    fitting = [fmt for fmt, score in zip(formats, scores) if score == best]
+    return fitting[0], fitting[1:]
+
+
+def parse_dates(series, date_format=None, formats=DATE_FORMATS):
+    """Convert ``series`` to datetimes with one explicit format.
+
+    The column is factorized, so each distinct string is parsed once however
+    often it repeats. ``date_format`` is detected from the distinct values
+    with ``detect_date_format`` when not given. Values it does not parse are
+    retried one by one with pandas' own inference (month-first). Returns
+    ``(parsed, report)`` where ``report`` holds the ``format`` used, whether
+    the sample also fit another format (``format_ambiguous``), and how many
+    rows needed the ``fallback``, of those were ``ambiguous`` (a day-first
+    reading gives a different date) and stayed ``unparseable`` (NaT).
+    """
+    report = {'format': date_format, 'format_ambiguous': False, 'fallback': 0, 'ambiguous': 0, 'unparseable': 0}
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series, report
+
+    codes, uniques = pd.factorize(series)
+    text = pd.Series(np.asarray(uniques, dtype=object)).astype(str).str.strip()
+    if date_format is None:
+        date_format, tied = detect_date_format(text, formats)
+        report['format'] = date_format
+        report['format_ambiguous'] = bool(tied)
+
+    if date_format is None:
+        parsed = pd.Series(pd.NaT, index=text.index, dtype='datetime64[ns]')
+    else:
+        parsed = pd.to_datetime(text, format=date_format, errors='coerce')
+    failed = (parsed.isna() & (text != '')).to_numpy()
+    if failed.any():
+        rows_per_value = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        retry = text[failed]
+        fallback = pd.to_datetime(retry, format='mixed', errors='coerce')
+        dayfirst = pd.to_datetime(retry, format='mixed', dayfirst=True, errors='coerce')
+        parsed[failed] = fallback
+        parsed_ok = fallback.notna().to_numpy()
+        ambiguous = parsed_ok & dayfirst.notna().to_numpy() & (dayfirst != fallback).to_numpy()
+        failed_rows = rows_per_value[failed]
+        report['fallback'] = int(failed_rows.sum())
+        report['ambiguous'] = int(failed_rows[ambiguous].sum())
+        report['unparseable'] = int(failed_rows[~parsed_ok].sum())
+
+    values = np.append(parsed.to_numpy(dtype='datetime64[ns]'), np.datetime64('NaT', 'ns'))[codes]
+    return pd.Series(values, index=series.index, name=series.name), report
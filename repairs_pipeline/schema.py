@@ -0,0 +1,151 @@
+import csv
+import functools
+
+import pandas as pd
+
+ENCODING = 'latin1'
+
+# Byte order mark as it appears when a UTF-8 file is decoded as latin1.
+_LATIN1_BOM = '\xef\xbb\xbf'
+
+TEXT = 'object'
+CATEGORY = 'category'
+INTEGER = 'Int64'
+FLOAT = 'float64'
+
+# Declared dtypes of the 52 columns in the raw task2.csv extract. Free text
+# and high-cardinality identifiers stay as Python strings, repeating codes
+# with a handful of distinct values are read as categoricals, and integer
+# codes use the nullable Int64 so a missing value does not turn the whole
+# column into floats. The cost and mileage measures are floats parsed with
+# ',' as the thousands separator ("8,872", "2,457.45").
+TASK2_SCHEMA = {
+    'VIN': TEXT,
+    'TRANSACTION_ID': INTEGER,
+    'CORRECTION_VERBATIM': TEXT,
+    'CUSTOMER_VERBATIM': TEXT,
+    'REPAIR_DATE': TEXT,
+    'CAUSAL_PART_NM': TEXT,
+    'GLOBAL_LABOR_CODE_DESCRIPTION': TEXT,
+    'PLATFORM': CATEGORY,
+    'BODY_STYLE': CATEGORY,
+    'VPPC': CATEGORY,
+    'PLANT': CATEGORY,
+    'BUILD_COUNTRY': CATEGORY,
+    'LAST_KNOWN_DLR_NAME': TEXT,
+    'LAST_KNOWN_DLR_CITY': TEXT,
+    'REPAIRING_DEALER_CODE': TEXT,
+    'DEALER_NAME': TEXT,
+    'REPAIR_DLR_CITY': TEXT,
+    'STATE': CATEGORY,
+    'DEALER_REGION': INTEGER,
+    'REPAIR_DLR_POSTAL_CD': TEXT,
+    'REPAIR_AGE': FLOAT,
+    'KM': FLOAT,
+    'COMPLAINT_CD_CSI': INTEGER,
+    'COMPLAINT_CD': CATEGORY,
+    'VEH_TEST_GRP': CATEGORY,
+    'COUNTRY_SALE_ISO': CATEGORY,
+    'ORD_SELLING_SRC_CD': INTEGER,
+    'OPTN_FAMLY_CERTIFICATION': CATEGORY,
+    'OPTF_FAMLY_EMISSIOF_SYSTEM': CATEGORY,
+    'GLOBAL_LABOR_CODE': INTEGER,
+    'TRANSACTION_CATEGORY': CATEGORY,
+    'CAMPAIGN_NBR': TEXT,
+    'REPORTING_COST': FLOAT,
+    'TOTALCOST': FLOAT,
+    'LBRCOST': FLOAT,
+    'ENGINE': CATEGORY,
+    'ENGINE_DESC': TEXT,
+    'TRANSMISSION': CATEGORY,
+    'TRANSMISSION_DESC': TEXT,
+    'ENGINE_SOURCE_PLANT': TEXT,
+    'ENGINE_TRACE_NBR': TEXT,
+    'TRANSMISSION_SOURCE_PLANT': INTEGER,
+    'TRANSMISSION_TRACE_NBR': TEXT,
+    'SRC_TXN_ID': INTEGER,
+    'SRC_VER_NBR': INTEGER,
+    'TRANSACTION_CNTR': INTEGER,
+    'MEDIA_FLAG': CATEGORY,
+    'VIN_MODL_DESGTR': CATEGORY,
+    'LINE_SERIES': CATEGORY,
+    'LAST_KNOWN_DELVRY_TYPE_CD': INTEGER,
+    'NON_CAUSAL_PART_QTY': INTEGER,
+    'SALES_REGION_CODE': INTEGER,
+}
+
+
+def read_header(file_name, encoding=ENCODING):
+    """Return the column names of ``file_name`` with any byte order mark removed."""
+    with open(file_name, encoding=encoding, newline='') as f:
+        header = next(csv.reader(f))
+    return [name.replace(_LATIN1_BOM, '').lstrip('\ufeff') for name in header]
+
+
+def schema_dtypes(columns, schema=TASK2_SCHEMA, categoricals=True, measures_as_text=False):
+    """Map the declared dtype onto each of ``columns`` present in ``schema``.
+
+    With ``categoricals=False`` categorical columns are read as plain text,
+    which is what the chunked reader wants: categories differ per chunk and
+    every chunk is written straight back to CSV anyway. With
+    ``measures_as_text=True`` the float measures are read as text and left
+    to ``parsing.parse_numeric``, for files with currency or other formatting
+    the C parser rejects.
+    """
+    dtypes = {}
+    for col in columns:
+        dtype = schema.get(col.strip().upper())
+        if dtype is None:
+            continue
+        if dtype == CATEGORY and not categoricals:
+            dtype = TEXT
+        if dtype == FLOAT and measures_as_text:
+            dtype = TEXT
+        dtypes[col] = dtype
+    return dtypes
+
+
+def read_typed_csv(file_name, schema=TASK2_SCHEMA, categoricals=True, chunksize=None, dtype=None,
+                   measures_as_text=False):
+    """Read the raw extract with the C parser and the declared column dtypes.
+
+    Columns missing from ``schema`` fall back to pandas' inference; declared
+    columns missing from the file are reported but not fatal. Raises
+    ``ValueError`` when a value does not fit its declared dtype. ``dtype``
+    overrides the declared dtype of individual columns.
+    """
+    names = read_header(file_name)
+    known = {col.strip().upper() for col in names}
+    missing = [col for col in schema if col not in known]
+    if missing:
+        print(f"Warning: {len(missing)} schema column(s) not found in '{file_name}': {', '.join(missing)}")
+
+    dtypes = schema_dtypes(names, schema, categoricals, measures_as_text)
+    dtypes.update(dtype or {})
+
+    # The C parser is several times slower on nullable integer columns than
+    # on floats, so they are parsed as float64 and converted afterwards.
+    integer_cols = [col for col, col_dtype in dtypes.items() if col_dtype == INTEGER]
+    dtypes.update(dict.fromkeys(integer_cols, FLOAT))
+
+    reader = pd.read_csv(
+        file_name,
+        encoding=ENCODING,
+        header=0,
+        names=names,
+        dtype=dtypes,
+        thousands=',',
+        chunksize=chunksize,
+    )
+    if chunksize is None:
+        return _to_nullable_integers(reader, integer_cols)
+    return map(functools.partial(_to_nullable_integers, integer_cols=integer_cols), reader)
+
+
+def _to_nullable_integers(df, integer_cols):
+    for col in integer_cols:
+        try:
+            df[col] = df[col].astype(INTEGER)
+        except TypeError:
+            print(f"Warning: '{col}' holds non-integer values, keeping it as float.")
+    return df
@@ -0,0 +1,98 @@
+import numpy as np
+
+
+class QuantileSketch:
+    """Mergeable, weighted quantile sketch (t-digest style).
+
+    Values are buffered and periodically folded into centroids whose size is
+    bounded by the arcsine scale function, so the tails (p01/p99) stay
+    accurate while the body is summarised coarsely. ``compression`` sets the
+    number of centroids kept (roughly ``compression / 2``) and therefore the
+    error bound. Until the first fold the sketch holds the raw values and
+    ``quantile`` matches pandas' linear interpolation exactly.
+    """
+
+    def __init__(self, compression=200, buffer_size=None):
+        self.compression = compression
+        self.buffer_size = buffer_size or 10 * compression
+        self.means = np.empty(0, dtype=float)
+        self.weights = np.empty(0, dtype=float)
+        self._buffer_means = []
+        self._buffer_weights = []
+        self._buffered = 0
+        self.count = 0.0
+        self.compressed = False
+
+    def update(self, values, weight=1.0):
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        if values.size == 0 or weight <= 0:
+            return self
+        self._buffer_means.append(values)
+        self._buffer_weights.append(np.full(values.size, float(weight)))
+        self._buffered += values.size
+        self.count += values.size * float(weight)
+        if self._buffered + self.means.size > self.buffer_size:
+            self._compress()
+        return self
+
+    def merge(self, other):
+        other._flush()
+        self._buffer_means.append(other.means)
+        self._buffer_weights.append(other.weights)
+        self._buffered += other.means.size
+        self.count += other.count
+        self.compressed = self.compressed or other.compressed
+        if self._buffered + self.means.size > self.buffer_size:
+            self._compress()
+        return self
+
+    def _flush(self):
+        if not self._buffered:
+            return
+        means = np.concatenate([self.means] + self._buffer_means)
+        weights = np.concatenate([self.weights] + self._buffer_weights)
+        order = np.argsort(means, kind='mergesort')
+        self.means = means[order]
+        self.weights = weights[order]
+        self._buffer_means = []
+        self._buffer_weights = []
+        self._buffered = 0
+
+    def _compress(self):
+        self._flush()
+        if self.means.size <= self.compression:
+            return
+        total = self.weights.sum()
+        q = (np.cumsum(self.weights) - self.weights / 2.0) / total
+        k = self.compression / (2.0 * np.pi) * np.arcsin(2.0 * q - 1.0)
+        groups = np.floor(k - k.min()).astype(np.int64)
+        starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+        weights = np.add.reduceat(self.weights, starts)
+        means = np.add.reduceat(self.means * self.weights, starts) / weights
+        self.means = means
+        self.weights = weights
+        self.compressed = True
+
+    def quantile(self, q):
+        """Return the estimated ``q`` quantile (scalar or array of quantiles)."""
+        self._flush()
+        scalar = np.ndim(q) == 0
+        q = np.atleast_1d(np.asarray(q, dtype=float))
+        if self.means.size == 0:
+            result = np.full(q.shape, np.nan)
+            return float(result[0]) if scalar else result
+
+        ends = np.cumsum(self.weights)
+        starts = ends - self.weights
+        position = q * (ends[-1] - 1.0)
+
+        idx = np.searchsorted(ends - 1.0, position, side='left')
+        idx = np.clip(idx, 0, self.means.size - 1)
+        inside = position >= starts[idx]
+        prev = np.clip(idx - 1, 0, self.means.size - 1)
+        gap = starts[idx] - (ends[prev] - 1.0)
+        frac = np.where(gap > 0, (position - (ends[prev] - 1.0)) / np.where(gap > 0, gap, 1.0), 0.0)
+        between = self.means[prev] + frac * (self.means[idx] - self.means[prev])
+        result = np.where(inside, self.means[idx], between)
+        return float(result[0]) if scalar else result
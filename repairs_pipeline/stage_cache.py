@@ -0,0 +1,111 @@
+import hashlib
+import json
+import os
+import pickle
+
+CACHE_DIR = '.pipeline_cache'
+
+# Total size of the cached stage outputs; least recently used entries are
+# removed once a write takes the cache past it.
+CACHE_MAX_BYTES = 2 * 1024 ** 3
+
+CACHE_SUFFIX = '.pkl'
+
+
+def stage_key(parent, stage, params=None, version=None):
+    """Cache key of ``stage`` given the key of the stage feeding it.
+
+    ``parent`` is the upstream key (the input file digest for the first
+    stage), so a key identifies the input together with every parameter and
+    code version on the way to ``stage``: changing one stage's parameters
+    invalidates that stage and everything after it, not the stages before.
+    """
+    digest = hashlib.sha256(parent.encode())
+    digest.update(json.dumps([stage, params, version], sort_keys=True, default=str).encode())
+    return digest.hexdigest()[:16]
+
+
+class StageCache:
+    """Pickled stage outputs under ``cache_dir``, evicted least recently used first.
+
+    Entries are named ``<stage>_<key>.pkl``. A hit refreshes the entry's
+    modification time, which is the recency the eviction goes by (access
+    times are often not updated on disk). Writes go through a temporary file,
+    so an interrupted run never leaves a truncated entry behind.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def path(self, stage, key):
+        return os.path.join(self.cache_dir, f"{stage}_{key}{CACHE_SUFFIX}")
+
+    def __contains__(self, entry):
+        return os.path.exists(self.path(*entry))
+
+    def load(self, stage, key):
+        """The value stored for ``(stage, key)``; raises ``KeyError`` on a miss."""
+        path = self.path(stage, key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            raise KeyError((stage, key)) from None
+        os.utime(path)
+        return value
+
+    def store(self, stage, key, value):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.path(stage, key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self.evict(keep=path)
+        return path
+
+    def entries(self):
+        """``(path, size, mtime)`` of every entry, least recently used first."""
+        if not os.path.isdir(self.cache_dir):
+            return []
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith(CACHE_SUFFIX):
+                stat = entry.stat()
+                entries.append((entry.path, stat.st_size, stat.st_mtime))
+        return sorted(entries, key=lambda e: e[2])
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, keep=None):
+        """Remove least recently used entries until the cache fits ``max_bytes``.
+
+        ``keep`` (the entry just written) is never removed, even when it
+        alone is larger than the limit. Returns the removed paths.
+        """
+        if self.max_bytes is None:
+            return []
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        removed = []
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed.append(path)
+        if removed:
+            print(f"Evicted {len(removed)} cached stage outputs to keep '{self.cache_dir}' "
+                  f"under {self.max_bytes / 1024 ** 2:.0f} MB")
+        return removed
+
+    def clear(self):
+        for path, _, _ in self.entries():
+            os.remove(path)
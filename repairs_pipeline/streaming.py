@@ -0,0 +1,180 @@
+import os
+
+import numpy as np
+
+from .cleaning import (
+    CLEANED_FILE_NAME,
+    OUTLIER_QUANTILES,
+    clean_text_columns,
+    clip_outliers,
+    consolidate_part_names,
+    correct_types,
+    drop_sparse_rows,
+    fill_missing,
+    outlier_bounds,
+    print_date_report,
+    print_null_contributions,
+    read_raw_chunks,
+    standardize_columns,
+)
+from .sketches import QuantileSketch
+
+CHUNKSIZE = 100_000
+SKETCH_COMPRESSION = 200
+
+
+def resolve_dtype(current, new):
+    """Widen ``current`` so every chunk seen so far fits the same dtype."""
+    if current is None or current == new:
+        return new
+    if current == object or new == object:
+        return np.dtype(object)
+    if current.kind == 'f' or new.kind == 'f':
+        return np.dtype(float)
+    return np.dtype(object)
+
+
+def prepare_chunk(chunk, pipeline, raw_dtypes=None, verbose=False, coerced=None, nulls=None, date_format=None,
+                  dates=None):
+    """Run the row-local stages (standardize, type, filter) on one chunk."""
+    if raw_dtypes is not None:
+        mismatched = {col: dtype for col, dtype in raw_dtypes.items() if chunk[col].dtype != dtype}
+        if mismatched:
+            chunk = chunk.astype(mismatched)
+    chunk = standardize_columns(chunk, verbose=verbose)
+    chunk = correct_types(chunk, pipeline.numeric_cols, verbose=verbose, coerced=coerced,
+                          date_format=date_format or pipeline.date_format, dates=dates)
+    return drop_sparse_rows(chunk, pipeline.max_missing, verbose=verbose, nulls=nulls)
+
+
+def collect_stream_statistics(pipeline, chunksize=CHUNKSIZE, compression=SKETCH_COMPRESSION):
+    """First pass: gather the global statistics the apply pass needs.
+
+    Medians come from one quantile sketch per numeric column. The outlier
+    bounds are taken from the same sketches after folding in the imputed
+    medians, so they describe the post-imputation column exactly as the
+    in-memory pipeline sees it. The date format is detected on the first
+    chunk and reused for the rest. In apply mode (``pipeline.statistics``
+    set) no sketches are built: the medians and bounds are the frozen ones,
+    and the pass only settles the dtypes and text columns.
+    """
+    frozen = pipeline.statistics
+    raw_dtypes = {}
+    numeric_dtypes = {}
+    text_cols = []
+    sketches = {}
+    missing = {}
+    coerced = {}
+    nulls = {}
+    dates = {}
+    rows_in = rows_kept = 0
+
+    for chunk in read_raw_chunks(pipeline.file_name, chunksize):
+        for col, dtype in chunk.dtypes.items():
+            raw_dtypes[col] = resolve_dtype(raw_dtypes.get(col), dtype)
+        rows_in += len(chunk)
+        chunk = prepare_chunk(chunk, pipeline, coerced=coerced, nulls=nulls, date_format=dates.get('format'),
+                              dates=dates)
+        rows_kept += len(chunk)
+        text_cols += [col for col in chunk.select_dtypes(include=['object']).columns if col not in text_cols]
+
+        for col in pipeline.numeric_cols:
+            if col in chunk.columns:
+                numeric_dtypes[col] = resolve_dtype(numeric_dtypes.get(col), chunk[col].dtype)
+                if frozen is not None:
+                    continue
+                sketch = sketches.setdefault(col, QuantileSketch(compression))
+                sketch.update(chunk[col].to_numpy(dtype=float, na_value=np.nan))
+                missing[col] = missing.get(col, 0) + int(chunk[col].isna().sum())
+
+    if frozen is not None:
+        medians = {col: median_val for col, median_val in frozen['medians'].items() if col in numeric_dtypes}
+        bounds = {col: frozen['bounds'][col] for col in pipeline.outlier_check_cols
+                  if col in numeric_dtypes and col in frozen['bounds']}
+    else:
+        medians = {col: sketch.quantile(0.5) for col, sketch in sketches.items()}
+        bounds = {}
+        for col in pipeline.outlier_check_cols:
+            if col in sketches:
+                sketch = sketches[col]
+                if missing[col] and not np.isnan(medians[col]):
+                    sketch.update([medians[col]], weight=missing[col])
+                bounds[col] = outlier_bounds(sketch.quantile(OUTLIER_QUANTILES))
+
+    return {
+        'raw_dtypes': raw_dtypes,
+        'numeric_dtypes': numeric_dtypes,
+        'text_cols': text_cols,
+        'medians': medians,
+        'bounds': bounds,
+        'coerced': coerced,
+        'nulls': nulls,
+        'dates': dates,
+        'rows_in': rows_in,
+        'rows_kept': rows_kept,
+    }
+
+
+def stream_clean(pipeline, output_file=CLEANED_FILE_NAME, chunksize=CHUNKSIZE,
+                 compression=SKETCH_COMPRESSION):
+    """Clean ``pipeline.file_name`` chunk by chunk into ``output_file``.
+
+    Memory is bounded by ``chunksize`` rather than by the size of the extract.
+    A statistics pass computes the medians and percentile caps with
+    mergeable quantile sketches, then an apply pass cleans every chunk
+    against them and appends it to ``output_file``.
+    """
+    if pipeline.outlier_group_cols or pipeline.impute_group_levels:
+        raise ValueError("Grouped outlier capping and imputation need the whole frame; use "
+                         "CleaningPipeline.run() or leave outlier_group_cols and impute_group_levels unset.")
+    print(f"Streaming '{pipeline.file_name}' in chunks of {chunksize} rows...")
+    print("Pass 1/2: collecting cleaning statistics...")
+    stats = collect_stream_statistics(pipeline, chunksize, compression)
+    if pipeline.statistics is not None:
+        print(f"Applying frozen medians and outlier caps from '{pipeline.statistics.get('source')}'.")
+
+    for col, col_coerced in stats['coerced'].items():
+        if col_coerced:
+            print(f"'{col}': {col_coerced} value(s) could not be parsed as numbers and were set to NaN.")
+    if stats['dates']:
+        print_date_report(stats['dates'])
+    print(f"Dropped {stats['rows_in'] - stats['rows_kept']} rows for having more than "
+          f"{pipeline.max_missing} missing values.")
+    print_null_contributions(stats['nulls'])
+    for col, median_val in stats['medians'].items():
+        print(f"Numeric gaps in '{col}' filled with median: {median_val}")
+
+    print("Pass 2/2: cleaning and writing chunks...")
+    outlier_counts = dict.fromkeys(stats['bounds'], 0)
+    part_name_rules = pipeline.part_name_rules()
+    if os.path.exists(output_file):
+        os.remove(output_file)
+
+    # Columns that are text in any chunk are read as text everywhere, so a
+    # chunk where they look numeric does not write them back as floats.
+    text_dtypes = {col: object for col, dtype in stats['raw_dtypes'].items() if dtype == object}
+    for chunk in read_raw_chunks(pipeline.file_name, chunksize, dtype=text_dtypes):
+        chunk = prepare_chunk(chunk, pipeline, stats['raw_dtypes'], date_format=stats['dates'].get('format'))
+        chunk = clean_text_columns(chunk, pipeline.text_cols, verbose=False)
+        chunk = fill_missing(chunk, stats['medians'], stats['text_cols'])
+
+        for col, bound in stats['bounds'].items():
+            chunk[col], outlier_count = clip_outliers(chunk[col], bound)
+            outlier_counts[col] += outlier_count
+
+        if 'causal_part_nm' in chunk.columns:
+            chunk['causal_part_nm'] = consolidate_part_names(chunk['causal_part_nm'], rules=part_name_rules)
+
+        chunk = chunk.astype(stats['numeric_dtypes'])
+
+        write_header = not os.path.exists(output_file)
+        chunk.to_csv(output_file, mode='a', header=write_header, index=False, encoding='utf-8')
+
+    for col, bound in stats['bounds'].items():
+        print(f"'{col}': Found {outlier_counts[col]} potential outliers "
+              f"(values < {bound['lower_bound']:.2f} or > {bound['upper_bound']:.2f})")
+        print(f"Capped '{col}' at 1st percentile ({bound['p01']:.2f}) and 99th percentile ({bound['p99']:.2f}).")
+
+    print("\n" + "=" * 30)
+    print(f"Successfully streamed {stats['rows_kept']} cleaned rows to '{output_file}'")
+    return stats
@@ -0,0 +1,139 @@
+import os
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import HashingVectorizer
+
+from .cleaning import CLEANED_FILE_NAME
+from .tagging import MAX_FEATURES, NGRAM_RANGE, TAG_KEY, TAGS_FILE_NAME, build_nlp_corpus, consolidate_tags
+
+N_FEATURES = 2 ** 20
+CHUNKSIZE = 100_000
+
+
+def _as_single_term(term):
+    return [term]
+
+
+class HashingTagger:
+    """Out-of-core replacement for the TfidfVectorizer tag vocabulary.
+
+    Terms are hashed into ``n_features`` buckets, so the only state kept
+    across chunks is a fixed-size array of corpus term counts, however many
+    verbatims are streamed through. Fitting takes two passes over the corpus:
+
+    1. ``partial_fit`` accumulates term counts per bucket.
+    2. ``partial_resolve`` recovers the term behind each of the top buckets;
+       only terms hashing into those few buckets are remembered.
+
+    ``finalize`` then keeps the ``max_features`` most frequent terms across
+    the corpus, ties broken alphabetically, which is how TfidfVectorizer
+    applies ``max_features``. Results differ from it only where two terms
+    share a bucket.
+    """
+
+    def __init__(self, max_features=MAX_FEATURES, ngram_range=NGRAM_RANGE, n_features=N_FEATURES):
+        self.max_features = max_features
+        self.n_features = n_features
+        self.vectorizer = HashingVectorizer(
+            stop_words='english', ngram_range=ngram_range, n_features=n_features,
+            alternate_sign=False, norm=None,
+        )
+        self._term_hasher = HashingVectorizer(
+            analyzer=_as_single_term, n_features=n_features, alternate_sign=False, norm=None,
+        )
+        self.term_counts = np.zeros(n_features)
+        self.n_documents = 0
+        self._candidates = None
+        self._bucket_terms = {}
+        self.buckets = None
+        self.feature_names = None
+
+    def partial_fit(self, corpus):
+        counts = self.vectorizer.transform(corpus)
+        self.term_counts += np.asarray(counts.sum(axis=0)).ravel()
+        self.n_documents += counts.shape[0]
+        return self
+
+    def candidate_buckets(self):
+        """Buckets that can make the top ``max_features``, including ties at the cut-off."""
+        if self._candidates is None:
+            used = np.flatnonzero(self.term_counts)
+            if used.size > self.max_features:
+                cutoff = np.partition(self.term_counts[used], -self.max_features)[-self.max_features]
+                used = used[self.term_counts[used] >= cutoff]
+            self._candidates = set(used.tolist())
+        return self._candidates
+
+    def partial_resolve(self, corpus):
+        candidates = self.candidate_buckets()
+        analyze = self.vectorizer.build_analyzer()
+        term_counts = Counter()
+        for document in corpus:
+            term_counts.update(analyze(document))
+        if not term_counts:
+            return self
+
+        terms = list(term_counts)
+        buckets = self._term_hasher.transform(terms).indices
+        for term, bucket in zip(terms, buckets):
+            if bucket in candidates:
+                self._bucket_terms.setdefault(bucket, Counter())[term] += term_counts[term]
+        return self
+
+    def finalize(self):
+        ranked = []
+        for bucket, terms in self._bucket_terms.items():
+            name = min(terms, key=lambda term: (-terms[term], term))
+            ranked.append((-self.term_counts[bucket], name, bucket))
+        top = sorted(sorted(ranked)[:self.max_features], key=lambda item: item[1])
+        self.feature_names = np.array([name for _, name, _ in top], dtype=object)
+        self.buckets = np.array([bucket for _, _, bucket in top], dtype=np.int64)
+        return self
+
+    def transform(self, corpus):
+        """Return the consolidated tag string of each document in ``corpus``."""
+        counts = self.vectorizer.transform(corpus).tocsc()[:, self.buckets]
+        return consolidate_tags(counts, self.feature_names)
+
+
+def _read_tag_chunks(cleaned_file, chunksize, key):
+    usecols = [key, 'customer_verbatim', 'correction_verbatim']
+    return pd.read_csv(cleaned_file, usecols=lambda col: col in usecols, chunksize=chunksize)
+
+
+def stream_nlp_tags(cleaned_file=CLEANED_FILE_NAME, file_name=TAGS_FILE_NAME, chunksize=CHUNKSIZE,
+                    max_features=MAX_FEATURES, ngram_range=NGRAM_RANGE, n_features=N_FEATURES, key=TAG_KEY):
+    """Tag a cleaned CSV of any size chunk by chunk with a ``HashingTagger``.
+
+    Reads only the key and verbatim columns, ``chunksize`` rows at a time,
+    for each of the two fitting passes and the tagging pass, and appends
+    the tags to ``file_name``. Returns the fitted tagger.
+    """
+    print(f"Streaming NLP tag generation over '{cleaned_file}' in chunks of {chunksize} rows...")
+    tagger = HashingTagger(max_features, ngram_range, n_features)
+
+    print("Pass 1/3: counting hashed terms...")
+    for chunk in _read_tag_chunks(cleaned_file, chunksize, key):
+        tagger.partial_fit(build_nlp_corpus(chunk))
+
+    print("Pass 2/3: resolving top tag names...")
+    for chunk in _read_tag_chunks(cleaned_file, chunksize, key):
+        tagger.partial_resolve(build_nlp_corpus(chunk))
+    tagger.finalize()
+    print(f"Selected {len(tagger.feature_names)} tags from {tagger.n_documents} documents.")
+
+    print("Pass 3/3: tagging transactions...")
+    if os.path.exists(file_name):
+        os.remove(file_name)
+    for chunk in _read_tag_chunks(cleaned_file, chunksize, key):
+        df_tags = pd.DataFrame(index=chunk.index)
+        if key in chunk.columns:
+            df_tags[key] = chunk[key]
+        df_tags['nlp_tags_consolidated'] = tagger.transform(build_nlp_corpus(chunk))
+        df_tags.to_csv(file_name, mode='a', header=not os.path.exists(file_name), index=False, encoding='utf-8')
+
+    print("\n" + "=" * 30)
+    print(f"Successfully saved final data to: {file_name}")
+    return tagger
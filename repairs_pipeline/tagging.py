@@ -0,0 +1,223 @@
+import json
+import os
+import pickle
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+TAGS_FILE_NAME = 'transaction_id_with_consolidated_nlp_tags.csv'
+TAG_KEY = 'transaction_id'
+
+MODEL_DIR = 'nlp_tag_model'
+MODEL_MANIFEST = 'model.json'
+
+MAX_FEATURES = 30
+NGRAM_RANGE = (1, 3)
+
+
+def consolidate_tags(tfidf_matrix, feature_names, separator=', '):
+    """Join the names of each row's non-zero features, in feature order.
+
+    Works straight off the CSR structure: ``indptr`` delimits each row's
+    slice of ``indices``, which maps onto ``feature_names``. Nothing
+    proportional to rows x features is ever materialized.
+    """
+    matrix = tfidf_matrix.tocsr()
+    matrix.eliminate_zeros()
+    matrix.sort_indices()
+
+    row_tags = np.asarray(feature_names, dtype=object)[matrix.indices]
+    indptr = matrix.indptr
+    return [separator.join(row_tags[start:end]) for start, end in zip(indptr[:-1], indptr[1:])]
+
+
+def build_nlp_corpus(df_cleaned):
+    customer = df_cleaned['customer_verbatim'].astype(str).fillna('')
+    correction = df_cleaned['correction_verbatim'].astype(str).fillna('')
+    return customer + ' ' + correction
+
+
+def new_vectorizer(max_features=MAX_FEATURES, ngram_range=NGRAM_RANGE):
+    # Imported here: scikit-learn takes about a second to import and the
+    # cleaning-only entry points never need it.
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    return TfidfVectorizer(stop_words='english', max_features=max_features, ngram_range=ngram_range)
+
+
+def tag_transactions(df_cleaned, vectorizer, key=TAG_KEY):
+    """Tag ``df_cleaned`` with an already fitted ``vectorizer``.
+
+    Only ``transform`` is called, so rows tagged against the same fitted
+    vocabulary always get the same tags.
+    """
+    tfidf_matrix = vectorizer.transform(build_nlp_corpus(df_cleaned))
+    return _tags_frame(df_cleaned, tfidf_matrix, vectorizer.get_feature_names_out(), key)
+
+
+def _tags_frame(df_cleaned, tfidf_matrix, feature_names, key):
+    print("Consolidating NLP tags into a single column...")
+    nlp_tags_consolidated = pd.Series(consolidate_tags(tfidf_matrix, feature_names), index=df_cleaned.index)
+    print("Consolidated NLP tag column created.")
+
+    df_final_output = pd.DataFrame(index=df_cleaned.index)
+    if key in df_cleaned.columns:
+        df_final_output[key] = df_cleaned[key]
+    else:
+        print(f"Warning: '{key}' column not found.")
+    df_final_output['nlp_tags_consolidated'] = nlp_tags_consolidated
+    return df_final_output
+
+
+def generate_nlp_tags(df_cleaned, max_features=MAX_FEATURES, ngram_range=NGRAM_RANGE, key=TAG_KEY):
+    """Fit a fresh TF-IDF vocabulary on ``df_cleaned`` and tag every transaction.
+
+    ``df_cleaned`` is the in-memory output of the cleaning pipeline and is not
+    modified; the returned frame holds ``key`` (when present) and
+    ``nlp_tags_consolidated``. Nothing is persisted; see ``update_nlp_tags``
+    and ``refit_nlp_tags`` for the versioned, incremental workflow.
+    """
+    print("Starting NLP Tag Generation (TF-IDF)...")
+
+    vectorizer = new_vectorizer(max_features, ngram_range)
+    tfidf_matrix = vectorizer.fit_transform(build_nlp_corpus(df_cleaned))
+    nlp_tags_raw = vectorizer.get_feature_names_out()
+
+    print(f"Generated {len(nlp_tags_raw)} tags dynamically using NLP.")
+    return _tags_frame(df_cleaned, tfidf_matrix, nlp_tags_raw, key)
+
+
+def load_model_manifest(model_dir=MODEL_DIR):
+    """The manifest of the latest saved model (version, vocabulary, ...), or ``None``."""
+    manifest_path = os.path.join(model_dir, MODEL_MANIFEST)
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def latest_model_version(model_dir=MODEL_DIR):
+    manifest = load_model_manifest(model_dir)
+    return manifest['version'] if manifest else None
+
+
+def load_tag_model(model_dir=MODEL_DIR, version=None):
+    """Return ``(vectorizer, version)`` for ``version`` or the latest model, or ``(None, None)``."""
+    version = version or latest_model_version(model_dir)
+    if version is None:
+        return None, None
+    with open(os.path.join(model_dir, f"tfidf_vectorizer_v{version}.pkl"), 'rb') as f:
+        return pickle.load(f), version
+
+
+def fit_tag_model(df_cleaned, model_dir=MODEL_DIR, max_features=MAX_FEATURES, ngram_range=NGRAM_RANGE):
+    """Fit a new vocabulary on ``df_cleaned`` and save it as the next model version.
+
+    Earlier versions are kept on disk; the manifest points at the new one.
+    """
+    vectorizer = new_vectorizer(max_features, ngram_range)
+    vectorizer.fit(build_nlp_corpus(df_cleaned))
+    version = (latest_model_version(model_dir) or 0) + 1
+
+    os.makedirs(model_dir, exist_ok=True)
+    with open(os.path.join(model_dir, f"tfidf_vectorizer_v{version}.pkl"), 'wb') as f:
+        pickle.dump(vectorizer, f)
+    manifest = {
+        'version': version,
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'documents': int(len(df_cleaned)),
+        'max_features': max_features,
+        'ngram_range': list(ngram_range),
+        'vocabulary': vectorizer.get_feature_names_out().tolist(),
+    }
+    with open(os.path.join(model_dir, MODEL_MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+    print(f"Fitted TF-IDF vocabulary v{version} with {len(manifest['vocabulary'])} tags on {len(df_cleaned)} documents.")
+    return vectorizer, version
+
+
+def refit_nlp_tags(df_cleaned, file_name=TAGS_FILE_NAME, model_dir=MODEL_DIR,
+                   max_features=MAX_FEATURES, ngram_range=NGRAM_RANGE, key=TAG_KEY):
+    """Re-baseline the vocabulary on ``df_cleaned`` and rewrite every tag."""
+    print("Refitting NLP tag vocabulary (TF-IDF)...")
+    vectorizer, _ = fit_tag_model(df_cleaned, model_dir, max_features, ngram_range)
+    df_final_output = tag_transactions(df_cleaned, vectorizer, key)
+    save_nlp_tags(df_final_output, file_name)
+    return df_final_output
+
+
+def frozen_model_version(statistics):
+    """The tag model version pinned in cleaning ``statistics``, or ``None`` if none was saved."""
+    return (statistics.get('tfidf') or {}).get('version')
+
+
+def update_nlp_tags(df_cleaned, file_name=TAGS_FILE_NAME, model_dir=MODEL_DIR, key=TAG_KEY, version=None):
+    """Tag only the transactions not already in ``file_name`` and append them.
+
+    Uses the latest persisted vocabulary so existing tags never change. With
+    no saved model yet this falls back to ``refit_nlp_tags``. ``version``
+    pins an earlier vocabulary instead, such as the one frozen in cleaning
+    statistics (see ``frozen_model_version``), so a later refit does not
+    change how new batches are tagged. Returns the newly tagged rows.
+    """
+    if version is not None and not os.path.exists(os.path.join(model_dir, f"tfidf_vectorizer_v{version}.pkl")):
+        raise FileNotFoundError(f"Tag model v{version} not found in '{model_dir}'.")
+    vectorizer, version = load_tag_model(model_dir, version)
+    if vectorizer is None:
+        return refit_nlp_tags(df_cleaned, file_name, model_dir, key=key)
+
+    df_new = df_cleaned
+    file_exists = os.path.exists(file_name)
+    if file_exists:
+        tagged = set(pd.read_csv(file_name, usecols=[key], dtype=str)[key])
+        df_new = df_cleaned[~df_cleaned[key].astype(str).isin(tagged)]
+
+    print(f"Tagging {len(df_new)} new of {len(df_cleaned)} transactions with vocabulary v{version}...")
+    if df_new.empty:
+        return pd.DataFrame(columns=[key, 'nlp_tags_consolidated'])
+
+    df_final_output = tag_transactions(df_new, vectorizer, key)
+    df_final_output.to_csv(file_name, mode='a', header=not file_exists, index=False, encoding='utf-8')
+    print(f"Appended {len(df_final_output)} rows to: {file_name}")
+    return df_final_output
+
+
+def save_nlp_tags(df_final_output, file_name=TAGS_FILE_NAME):
+    df_final_output.to_csv(file_name, index=False, encoding='utf-8')
+
+    print("\n" + "=" * 30)
+    print(f"Successfully saved final data to: {file_name}")
+    return file_name
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from .cleaning import CLEANED_FILE_NAME, CLEANED_PARQUET_FILE_NAME, load_cleaned, load_statistics
+
+    parser = argparse.ArgumentParser(description="Tag cleaned repairs with the persisted TF-IDF vocabulary.")
+    parser.add_argument('command', choices=['update', 'refit'], nargs='?', default='update',
+                        help="'update' tags only new transactions; 'refit' re-baselines the vocabulary")
+    parser.add_argument('--input', default=None, help="cleaned Parquet or CSV file")
+    parser.add_argument('--output', default=TAGS_FILE_NAME)
+    parser.add_argument('--model-dir', default=MODEL_DIR)
+    parser.add_argument('--statistics', default=None,
+                        help="tag with the vocabulary version frozen in these cleaning statistics")
+    args = parser.parse_args()
+    version = None
+    if args.statistics:
+        if args.command == 'refit':
+            parser.error("--statistics pins a frozen vocabulary; it cannot be combined with 'refit'")
+        version = frozen_model_version(load_statistics(args.statistics))
+
+    input_file = args.input or (CLEANED_PARQUET_FILE_NAME if os.path.exists(CLEANED_PARQUET_FILE_NAME)
+                                else CLEANED_FILE_NAME)
+    df_cleaned = load_cleaned(input_file, [TAG_KEY, 'customer_verbatim', 'correction_verbatim'])
+    if df_cleaned is None:
+        raise SystemExit(1)
+    if args.command == 'refit':
+        refit_nlp_tags(df_cleaned, args.output, args.model_dir)
+    else:
+        update_nlp_tags(df_cleaned, args.output, args.model_dir, version=version)
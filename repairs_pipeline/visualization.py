@@ -0,0 +1,101 @@
+import os
+
+import pandas as pd
+
+from .cleaning import CLEANED_FILE_NAME, CLEANED_PARQUET_FILE_NAME, load_cleaned
+
+CHART_COLUMNS = ['global_labor_code_description', 'platform', 'totalcost']
+TOP_REPAIRS_CHART = 'top_repair_types.png'
+PLATFORM_CHART = 'repairs_by_platform.png'
+COST_CHART = 'cost_distribution.png'
+CHART_FILE_NAMES = (TOP_REPAIRS_CHART, PLATFORM_CHART, COST_CHART)
+
+
+def analyze_repairs(data, output_dir=None):
+    """Save the repair-type, platform and cost charts into ``output_dir`` (the working directory by default).
+
+    ``data`` is either the cleaned DataFrame handed over by the cleaning
+    pipeline or the path of a cleaned Parquet or CSV file; from a file only
+    the charted columns are loaded. Returns the paths of the saved charts,
+    or ``None`` when the file could not be loaded.
+
+    pyplot is imported on the first call, so importing this module does not
+    start a matplotlib backend; headless callers select ``Agg`` before
+    calling (the command line does).
+    """
+    import matplotlib.pyplot as plt
+    import matplotlib.ticker as mticker
+
+    if isinstance(data, pd.DataFrame):
+        df = data
+    else:
+        df = load_cleaned(data, CHART_COLUMNS)
+        if df is None:
+            return
+
+    print("Data loaded successfully. Generating visualizations...")
+    output_dir = output_dir or ''
+    saved = []
+
+    # Categorical columns report unused categories with a zero count.
+    repair_counts = df['global_labor_code_description'].value_counts()
+    repair_counts = repair_counts[repair_counts > 0]
+    top_n = 10
+    repair_counts_top = repair_counts.head(top_n)
+
+    plt.figure(figsize=(10, 6))
+    repair_counts_top.sort_values(ascending=True).plot(kind='barh', color='skyblue')
+    plt.title(f'Top {top_n} Most Common Repair Types', fontsize=16)
+    plt.xlabel('Number of Repairs', fontsize=12)
+    plt.ylabel('Repair Type', fontsize=12)
+    ax = plt.gca()
+    ax.xaxis.set_major_locator(mticker.MaxNLocator(integer=True))
+    plt.tight_layout()
+    output_png_1 = os.path.join(output_dir, TOP_REPAIRS_CHART)
+    plt.savefig(output_png_1)
+    print(f"Saved: '{output_png_1}'")
+    saved.append(output_png_1)
+
+    platform_counts = df['platform'].value_counts()
+    platform_counts = platform_counts[platform_counts > 0]
+    plt.figure(figsize=(10, 6))
+    platform_counts.sort_values(ascending=True).plot(kind='barh', color='coral')
+    plt.title('Repairs by Vehicle Platform', fontsize=16)
+    plt.xlabel('Number of Repairs', fontsize=12)
+    plt.ylabel('Platform', fontsize=12)
+    ax = plt.gca()
+    ax.xaxis.set_major_locator(mticker.MaxNLocator(integer=True))
+    plt.tight_layout()
+    output_png_2 = os.path.join(output_dir, PLATFORM_CHART)
+    plt.savefig(output_png_2)
+    print(f"Saved: '{output_png_2}'")
+    saved.append(output_png_2)
+
+    plt.figure(figsize=(10, 6))
+    if 'totalcost' in df.columns:
+        df['totalcost'].plot(kind='hist', bins=20, color='green', edgecolor='black')
+        plt.title('Distribution of Total Repair Costs', fontsize=16)
+        plt.xlabel('Total Cost ($)', fontsize=12)
+        plt.ylabel('Frequency (Number of Repairs)', fontsize=12)
+        ax = plt.gca()
+        ax.xaxis.set_major_formatter(mticker.FormatStrFormatter('$%1.0f'))
+        plt.tight_layout()
+        output_png_3 = os.path.join(output_dir, COST_CHART)
+        plt.savefig(output_png_3)
+        print(f"Saved: '{output_png_3}'")
+        saved.append(output_png_3)
+    else:
+        print("Warning: 'totalcost' column not found. Skipping cost distribution chart.")
+
+    print("\nAnalysis complete. All charts have been saved as .png files.")
+    return saved
+
+
+if __name__ == "__main__":
+    import matplotlib
+
+    matplotlib.use('Agg')
+    if os.path.exists(CLEANED_PARQUET_FILE_NAME):
+        analyze_repairs(CLEANED_PARQUET_FILE_NAME)
+    else:
+        analyze_repairs(CLEANED_FILE_NAME)